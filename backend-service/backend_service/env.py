@@ -10,6 +10,29 @@ class Env:
     # Write all environment variables here
     # .env
     POSTGRES_HOST: str
+    POSTGRES_POOL_SIZE: int
+    POSTGRES_MAX_OVERFLOW: int
+    POSTGRES_POOL_TIMEOUT: float
+    POSTGRES_POOL_RECYCLE: int
+    POSTGRES_POOL_PRE_PING: bool
+    PLACE_INDEX_ENABLED: bool
+    PLACE_INDEX_REFRESH_SECONDS: float
+    ROUTE_CACHE_ENABLED: bool
+    ROUTE_CACHE_GRID_METER: float
+    ROUTE_CACHE_DEPARTURE_BUCKET_SECONDS: float
+    ROUTE_CACHE_TTL_SECONDS: float
+    ROUTE_CACHE_MAX_SIZE: int
+    ROUTE_CACHE_PATH: str  # Empty: not persisted
+    ROUTES_MAX_CONCURRENCY: int
+    ROUTES_MAX_QUEUE: int
+    ROUTES_TIMEOUT_SECONDS: float
+    ROUTES_BREAKER_FAILURE_RATE: float
+    ROUTES_BREAKER_WINDOW: int
+    ROUTES_BREAKER_OPEN_SECONDS: float
+    TILE_CACHE_ENABLED: bool
+    TILE_CACHE_MAX_SIZE: int
+    TILE_CACHE_PATH: str  # Empty: not persisted
+    DATA_VERSION_REFRESH_SECONDS: float
     # .secret
     GCP_API_KEY: str
     POSTGRES_USER: str
@@ -37,12 +60,25 @@ class Env:
             load_dotenv(".secret")
 
     def set_env_from_os(self) -> None:
-        for key in typing.get_type_hints(self).keys():
+        for key, type_hint in typing.get_type_hints(self).items():
             if key.startswith("_"):  # filter some attributes
                 continue
             if key not in os.environ:
                 raise Exception(f"Missing {key} in os.environ")
-            setattr(self, key, os.environ[key])
+            setattr(self, key, self.parse_value(key, type_hint, os.environ[key]))
+
+    @staticmethod
+    def parse_value(key: str, type_hint: typing.Any, value: str) -> typing.Any:
+        """Convert os.environ string by type hint (str, int, float, bool)"""
+        if type_hint is bool:
+            if value.lower() in ("true", "1", "yes"):
+                return True
+            if value.lower() in ("false", "0", "no"):
+                return False
+            raise ValueError(f"{key}={value} is not a bool")
+        if type_hint in (int, float):
+            return type_hint(value)
+        return value
 
     def __str__(self) -> str:
         return "\n".join([f"{key}: {value}" for key, value in vars(self).items()])
@@ -0,0 +1,114 @@
+import os
+import pickle
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Generic, Hashable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class LRUCache(Generic[K, V]):
+    """Size-bounded LRU cache with optional TTL and pickle persistence
+
+    Expiry uses wall-clock time (`time.time`) so that persisted entries
+    keep their deadline across restarts.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl_second: float | None = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        if max_size <= 0:
+            raise ValueError("max_size should be positive")
+        self.max_size = max_size
+        self.ttl_second = ttl_second
+        self._clock = clock
+        self._lock = threading.Lock()
+        # key -> (expires_at, value), least recently used first
+        self._entries: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: K) -> V | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= self._clock():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: K, value: V) -> None:
+        expires_at = (
+            self._clock() + self.ttl_second
+            if self.ttl_second is not None
+            else float("inf")
+        )
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        requests = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / requests if requests else 0.0,
+        }
+
+    def save(self, path: str) -> None:
+        """Write unexpired entries to `path` (atomically replaced)
+
+        Each call writes its own temp file, so workers saving the same path
+        concurrently don't interleave: the last replace wins.
+        """
+        now = self._clock()
+        with self._lock:
+            entries = [(k, e) for k, e in self._entries.items() if e[0] > now]
+
+        file_descriptor, temp_path = tempfile.mkstemp(
+            dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp"
+        )
+        try:
+            with os.fdopen(file_descriptor, "wb") as file:
+                pickle.dump(entries, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
+    def load(self, path: str) -> int:
+        """Read entries saved by `save`. Returns the number of entries loaded"""
+        if not os.path.isfile(path):
+            return 0
+        with open(path, "rb") as file:
+            entries: list[tuple[K, tuple[float, V]]] = pickle.load(file)
+
+        now = self._clock()
+        with self._lock:
+            for key, entry in entries[-self.max_size :]:
+                if entry[0] > now:
+                    self._entries[key] = entry
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+            return len(self._entries)
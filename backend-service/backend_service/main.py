@@ -1,31 +1,205 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
+from datetime import datetime, timedelta, timezone
 import logging
-from typing import Annotated, Sequence
-from fastapi import Body, FastAPI, Depends, Response
-from geoalchemy2 import Geometry
-from pydantic import BaseModel
+import math
+import os
+from typing import Annotated, Any, AsyncIterator, Hashable, Sequence
+from fastapi import (
+    Body,
+    FastAPI,
+    Depends,
+    Header,
+    HTTPException,
+    Path,
+    Query,
+    Request,
+    Response,
+)
+from fastapi.responses import JSONResponse, ORJSONResponse, StreamingResponse
+from pydantic import BaseModel, Field
 from pydantic_extra_types.coordinate import Coordinate
-from sqlalchemy import Row, Select, select, cast
-from geoalchemy2.functions import ST_X, ST_Y, ST_Distance
-from sqlalchemy.orm import Session
+from sqlalchemy import Row, Select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from .env import env
 
 
 from .outbound import routes_api
+from .outbound.guard import OutboundTimeoutError, OverloadedError
+from .outbound.route_cache import RouteCache
+from .outbound.route_matrix import ndjson_lines, stream_route_matrix
+from .outbound.single_flight import SingleFlight
 from .models import Place
+from . import place_export, place_queries
+from .place_index import PlaceIndex
+from .tile_cache import TileCache
 from nyeok_database_core import db
 from nyeok_database_core.tables import Place as DBPlace
 
 
-app = FastAPI()
+logger = logging.getLogger(__name__)
 
-db.setup(
+db.setup_async(
     username=env.POSTGRES_USER,
     password=env.POSTGRES_PASSWORD,
     hostname=env.POSTGRES_HOST,
     port=5432,
     databasename="database",
+    pool_size=env.POSTGRES_POOL_SIZE,
+    max_overflow=env.POSTGRES_MAX_OVERFLOW,
+    pool_timeout=env.POSTGRES_POOL_TIMEOUT,
+    pool_recycle=env.POSTGRES_POOL_RECYCLE,
+    pool_pre_ping=env.POSTGRES_POOL_PRE_PING,
+)
+
+# In-process copy of the place table (served instead of DB when loaded)
+place_index = PlaceIndex()
+
+
+# Results of compute_routes for nearby origin/destination pairs
+# (ROUTE_CACHE_PATH is relative to this directory, like .env files)
+route_cache_path: str | None = (
+    os.path.join(os.path.dirname(__file__), env.ROUTE_CACHE_PATH)
+    if env.ROUTE_CACHE_PATH
+    else None
+)
+route_cache: RouteCache | None = (
+    RouteCache(
+        grid_meter=env.ROUTE_CACHE_GRID_METER,
+        departure_bucket_second=env.ROUTE_CACHE_DEPARTURE_BUCKET_SECONDS,
+        ttl_second=env.ROUTE_CACHE_TTL_SECONDS,
+        max_size=env.ROUTE_CACHE_MAX_SIZE,
+    )
+    if env.ROUTE_CACHE_ENABLED
+    else None
+)
+
+# Identical concurrent compute_routes calls share one upstream call
+routes_single_flight: SingleFlight[bytes] = SingleFlight()
+
+# Vector tiles of the place table, until database_setup changes it
+tile_cache_path: str | None = (
+    os.path.join(os.path.dirname(__file__), env.TILE_CACHE_PATH)
+    if env.TILE_CACHE_PATH
+    else None
+)
+tile_cache: TileCache | None = (
+    TileCache(max_size=env.TILE_CACHE_MAX_SIZE) if env.TILE_CACHE_ENABLED else None
 )
+# Concurrent requests of a tile missing from the cache render it once
+tiles_single_flight: SingleFlight[bytes] = SingleFlight()
+
+
+async def refresh_place_index() -> None:
+    async with db.get_async_session_with() as session:
+        if await place_index.refresh(session):
+            logger.info(f"Place index reloaded: {len(place_index.snapshot or [])} rows")
+
+
+async def refresh_place_index_periodically() -> None:
+    while True:
+        await asyncio.sleep(env.PLACE_INDEX_REFRESH_SECONDS)
+        try:
+            await refresh_place_index()
+        except Exception:
+            # Keep serving the previous snapshot
+            logger.exception("Failed to refresh place index")
+
+
+async def cancel_task(task: asyncio.Task[None]) -> None:
+    """Cancel and wait for the task, so it's not running during shutdown"""
+    task.cancel()
+    with suppress(asyncio.CancelledError):
+        await task
+
+
+async def refresh_tile_cache_version(tile_cache: TileCache) -> None:
+    async with db.get_async_session_with() as session:
+        if await tile_cache.refresh_version(session):
+            logger.info(f"Tile cache data version: {tile_cache.version}")
+
+
+async def refresh_tile_cache_version_periodically(tile_cache: TileCache) -> None:
+    while True:
+        await asyncio.sleep(env.DATA_VERSION_REFRESH_SECONDS)
+        try:
+            await refresh_tile_cache_version(tile_cache)
+        except Exception:
+            # Keep the current version: tiles may be stale until the next refresh
+            logger.exception("Failed to refresh tile cache version")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    refresh_task: asyncio.Task[None] | None = None
+    if env.PLACE_INDEX_ENABLED:
+        try:
+            await refresh_place_index()
+        except Exception:
+            # Fall back to DB queries until the next refresh succeeds
+            logger.exception("Failed to load place index")
+        refresh_task = asyncio.create_task(refresh_place_index_periodically())
+
+    version_task: asyncio.Task[None] | None = None
+    if tile_cache is not None:
+        if tile_cache_path is not None:
+            try:
+                tile_cache.load(tile_cache_path)
+            except Exception:
+                logger.exception("Failed to load tile cache")
+        try:
+            await refresh_tile_cache_version(tile_cache)
+        except Exception:
+            # Tiles are not cached until the version is known
+            logger.exception("Failed to read tile cache version")
+        version_task = asyncio.create_task(
+            refresh_tile_cache_version_periodically(tile_cache)
+        )
+
+    if route_cache is not None and route_cache_path is not None:
+        try:
+            route_cache.load(route_cache_path)
+        except Exception:
+            logger.exception("Failed to load route cache")
+
+    try:
+        await routes_api.warm_up()
+    except Exception:
+        # The channel keeps trying to connect in the background
+        logger.exception("Failed to warm up Routes API channel")
+
+    yield
+
+    if refresh_task is not None:
+        await cancel_task(refresh_task)
+    if version_task is not None:
+        await cancel_task(version_task)
+    await routes_api.close_client()
+    if route_cache is not None and route_cache_path is not None:
+        route_cache.save(route_cache_path)
+    if tile_cache is not None and tile_cache_path is not None:
+        tile_cache.save(tile_cache_path)
+    await db.dispose_async()
+
+
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
+
+
+@app.exception_handler(OverloadedError)
+async def overloaded_handler(request: Request, exception: OverloadedError):
+    # Shed load: tell clients when to retry instead of queueing them
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exception)},
+        headers={"Retry-After": str(math.ceil(exception.retry_after_second))},
+    )
+
+
+@app.exception_handler(OutboundTimeoutError)
+async def outbound_timeout_handler(request: Request, exception: OutboundTimeoutError):
+    # The upstream call was sent but did not answer within the deadline
+    return JSONResponse(status_code=504, content={"detail": str(exception)})
 
 
 @app.get("/")
@@ -43,16 +217,13 @@ async def echo(message: str | None = None) -> str:
 
 
 @app.get("/place_sample")
-def place_sample(session: Session = Depends(db.get_session_yield)) -> Place:
-    # cast Geography to Geometry (ST_X, ST_Y only works with Geometry)
-    statement: Select[tuple[DBPlace, float, float]] = select(
-        DBPlace,
-        ST_X(cast(DBPlace.coordinate, Geometry("POINT", srid=4326))),
-        ST_Y(cast(DBPlace.coordinate, Geometry("POINT", srid=4326))),
-    )
+async def place_sample(
+    session: AsyncSession = Depends(db.get_async_session_yield),
+) -> Place:
+    statement: Select[tuple[DBPlace, float, float]] = place_queries.place_sample()
 
-    single_record: Row[tuple[DBPlace, float, float]] | None = session.execute(
-        statement
+    single_record: Row[tuple[DBPlace, float, float]] | None = (
+        await session.execute(statement)
     ).first()
     if single_record is None:
         raise ValueError("No records found")
@@ -70,49 +241,243 @@ class PlacesResult(BaseModel):
     place_and_distance_list: list[PlaceAndDistance]
 
 
-@app.post("/places_closest")
-def places_closest(
+# Place responses are built from our own data: they are returned as trusted dicts
+# (models.trusted_place) in an ORJSONResponse, skipping FastAPI's validation and
+# serialization against response_model (which is kept for the OpenAPI schema)
+@app.post("/places_closest", response_model=PlacesResult)
+async def places_closest(
     user_coordinate: Annotated[
         Coordinate, Body(examples=[{"longitude": 126.9402326, "latitude": 37.5565616}])
     ],
-    session: Session = Depends(db.get_session_yield),
-) -> PlacesResult:
-    statement: Select[tuple[DBPlace, float, float, float]] = select(
-        DBPlace,
-        ST_X(cast(DBPlace.coordinate, Geometry("POINT", srid=4326))),
-        ST_Y(cast(DBPlace.coordinate, Geometry("POINT", srid=4326))),
-        ST_Distance(
-            DBPlace.coordinate,
-            f"POINT({user_coordinate.longitude} {user_coordinate.latitude})",
-            use_spheroid=True,
-        ).label(
-            "distance"
-        ),  # type: ignore
-    ).order_by("distance")
-
-    all_records: Sequence[Row[tuple[DBPlace, float, float, float]]] = session.execute(
-        statement
-    ).all()
+    k: Annotated[int, Query(ge=1, le=100)] = 3,
+    max_distance_meter: Annotated[float | None, Query(gt=0)] = None,
+    offset: Annotated[int, Query(ge=0)] = 0,
+    content_type_id: Annotated[int | None, Query(alias="contentTypeId")] = None,
+    cat1: str | None = None,
+    cat2: str | None = None,
+    cat3: str | None = None,
+    area_code: Annotated[int | None, Query(alias="areaCode")] = None,
+    session: AsyncSession = Depends(db.get_async_session_yield),
+) -> Response:
+    place_filter = place_queries.PlaceFilter(
+        content_type_id=content_type_id,
+        cat1=cat1,
+        cat2=cat2,
+        cat3=cat3,
+        area_code=area_code,
+    )
+    snapshot = place_index.snapshot
+    if snapshot is not None:
+        indices, distances = snapshot.nearest(
+            longitude=user_coordinate.longitude,
+            latitude=user_coordinate.latitude,
+            k=k,
+            max_distance_meter=max_distance_meter,
+            offset=offset,
+            mask=snapshot.mask(place_filter),
+        )
+        return ORJSONResponse(
+            {
+                "place_and_distance_list": [
+                    {
+                        "place": Place.trusted_from_snapshot_place(
+                            snapshot.place(index)
+                        ),
+                        "distance_meter": float(distance),
+                    }
+                    for index, distance in zip(indices, distances)
+                ]
+            }
+        )
 
-    if not len(all_records) >= 3:
-        raise ValueError("Records less than 3")
+    statement: Select[tuple[DBPlace, float, float, float]] = (
+        place_queries.closest_places(
+            longitude=user_coordinate.longitude,
+            latitude=user_coordinate.latitude,
+            k=k,
+            max_distance_meter=max_distance_meter,
+            offset=offset,
+            place_filter=place_filter,
+        )
+    )
 
-    results: list[PlaceAndDistance] = []
-    for single_record in all_records[:3]:
+    # At most k rows are transferred (may be less than k within max_distance_meter)
+    records: Sequence[Row[tuple[DBPlace, float, float, float]]] = (
+        await session.execute(statement)
+    ).all()
+
+    results: list[dict[str, Any]] = []
+    for single_record in records:
         dbPlace, longitude, latitude, distance = single_record
         results.append(
-            PlaceAndDistance(
-                place=Place.from_sqlalchemy_model(dbPlace, longitude, latitude),
-                distance_meter=distance,
-            )
+            {
+                "place": Place.trusted_from_sqlalchemy_model(
+                    dbPlace, longitude, latitude
+                ),
+                "distance_meter": distance,
+            }
+        )
+
+    return ORJSONResponse({"place_and_distance_list": results})
+
+
+class PlaceCluster(BaseModel):
+    coordinate: Coordinate  # Centroid of the places
+    count: int
+    contentid: int  # The place itself when count is 1
+
+
+class PlacesInBboxResult(BaseModel):
+    places: list[Place]  # Zoomed in
+    clusters: list[PlaceCluster]  # Zoomed out
+    truncated: bool  # More places (or clusters) than limit in the box
+
+
+@app.get("/places_in_bbox", response_model=PlacesInBboxResult)
+async def places_in_bbox(
+    min_longitude: Annotated[float, Query(ge=-180, le=180)],
+    min_latitude: Annotated[float, Query(ge=-90, le=90)],
+    max_longitude: Annotated[float, Query(ge=-180, le=180)],
+    max_latitude: Annotated[float, Query(ge=-90, le=90)],
+    zoom: Annotated[int, Query(ge=0, le=22)],
+    limit: Annotated[int, Query(ge=1, le=1000)] = 500,
+    content_type_id: Annotated[int | None, Query(alias="contentTypeId")] = None,
+    cat1: str | None = None,
+    cat2: str | None = None,
+    cat3: str | None = None,
+    area_code: Annotated[int | None, Query(alias="areaCode")] = None,
+    session: AsyncSession = Depends(db.get_async_session_yield),
+) -> Response:
+    """Places of a map viewport, or clusters of them below CLUSTER_BELOW_ZOOM
+
+    Clusters are counted on a grid of zoom-dependent cells, so the response size
+    depends on the viewport, not on the number of places. Both places and
+    clusters are capped by limit.
+    """
+    if min_longitude >= max_longitude or min_latitude >= max_latitude:
+        raise HTTPException(status_code=422, detail="Empty bounding box")
+    bbox = place_queries.BoundingBox(
+        min_longitude, min_latitude, max_longitude, max_latitude
+    )
+    place_filter = place_queries.PlaceFilter(
+        content_type_id=content_type_id,
+        cat1=cat1,
+        cat2=cat2,
+        cat3=cat3,
+        area_code=area_code,
+    )
+
+    # One more row tells whether the box has more than limit places (or clusters)
+    if zoom < place_queries.CLUSTER_BELOW_ZOOM:
+        cluster_statement = place_queries.place_clusters_in_bounding_box(
+            bbox, place_queries.cluster_cell_degree(zoom), limit + 1, place_filter
         )
+        clusters = (await session.execute(cluster_statement)).tuples().all()
+        return ORJSONResponse(
+            {
+                "places": [],
+                "clusters": [
+                    {
+                        "coordinate": {"latitude": latitude, "longitude": longitude},
+                        "count": count,
+                        "contentid": contentid,
+                    }
+                    for count, longitude, latitude, contentid in clusters[:limit]
+                ],
+                "truncated": len(clusters) > limit,
+            }
+        )
+
+    statement = place_queries.places_in_bounding_box(bbox, limit + 1, place_filter)
+    records = (await session.execute(statement)).tuples().all()
+    return ORJSONResponse(
+        {
+            "places": [
+                Place.trusted_from_sqlalchemy_model(dbPlace, longitude, latitude)
+                for dbPlace, longitude, latitude in records[:limit]
+            ],
+            "clusters": [],
+            "truncated": len(records) > limit,
+        }
+    )
 
-    return PlacesResult(place_and_distance_list=results)
+
+@app.get("/tiles/places/{z}/{x}/{y}.mvt")
+async def place_tile(
+    z: Annotated[int, Path(ge=0, le=22)],
+    x: Annotated[int, Path(ge=0)],
+    y: Annotated[int, Path(ge=0)],
+) -> Response:
+    """Mapbox Vector Tile of places (layer "places"), clusters below zoom 14"""
+    media_type = "application/vnd.mapbox-vector-tile"
+    if x >= 2**z or y >= 2**z:
+        raise HTTPException(status_code=404, detail="Tile out of range")
+
+    # None: not cached (disabled, or data version not known yet)
+    key = tile_cache.key(z, x, y) if tile_cache is not None else None
+    if tile_cache is not None and key is not None:
+        tile = tile_cache.get(key)
+        if tile is not None:
+            return Response(content=tile, media_type=media_type)
+
+    async def render() -> bytes:
+        # A session only on a cache miss: a warm cache doesn't touch Postgres
+        async with db.get_async_session_with() as session:
+            statement = place_queries.place_tile(z, x, y)
+            rendered: bytes = (await session.execute(statement)).scalar_one()
+        if tile_cache is not None and key is not None:
+            tile_cache.put(key, rendered)
+        return rendered
+
+    tile = await tiles_single_flight.do((key, z, x, y), render)
+    return Response(content=tile, media_type=media_type)
+
+
+# Naive times of the API are KST, like TourAPI times (place.modifiedtime)
+KST = timezone(timedelta(hours=9))
+
+
+@app.get("/places/export")
+async def export_places(
+    request: Request,
+    updated_since: Annotated[
+        datetime | None,
+        Query(description="Only places written since (KST if naive)"),
+    ] = None,
+) -> StreamingResponse:
+    """NDJSON of every place, one per line, ordered by contentid
+
+    Delta sync: pass the largest updated_at already synced as updated_since.
+    updated_at is when the row was written (the start of its load transaction),
+    so a delta also has rows rewritten without a new TourAPI modifiedtime. Keep
+    a margin for loads still running (e.g. an hour earlier): lines are whole
+    places, receiving one twice is harmless.
+
+    Deleted places are not part of a delta: clients need a periodic full export
+    (without updated_since) to drop them. Gzip-compressed when the client
+    accepts it (Accept-Encoding: gzip, not with q=0).
+    """
+    if updated_since is not None and updated_since.tzinfo is None:
+        updated_since = updated_since.replace(tzinfo=KST)
+
+    async def lines() -> AsyncIterator[bytes]:
+        # Not a Depends session: those are closed before the response is streamed
+        async with db.get_async_session_with() as session:
+            async for chunk in place_export.place_lines(session, updated_since):
+                yield chunk
+
+    # Caches must not serve the gzip body to clients that didn't ask for it
+    headers = {"Vary": "Accept-Encoding"}
+    body = lines()
+    if place_export.accepts_gzip(request.headers.get("accept-encoding", "")):
+        body = place_export.gzip_chunks(body)
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(body, media_type="application/x-ndjson", headers=headers)
 
 
 @app.get("/compute_routes_sample")
 async def compute_routes_sample() -> Response:
-    resultJson: str = await routes_api.sample_compute_routes()
+    resultJson: bytes = await routes_api.sample_compute_routes()
     return Response(content=resultJson, media_type="application/json")
 
 
@@ -122,13 +487,126 @@ class RouteRequest(BaseModel):
 
 
 @app.post("/compute_routes")
-async def compute_routes(request: RouteRequest) -> Response:
+async def compute_routes(
+    request: RouteRequest,
+    profile: Annotated[
+        routes_api.RouteProfile,
+        Query(description="summary: duration, distance, polyline / full: all fields"),
+    ] = routes_api.RouteProfile.FULL,
+    x_route_cache: Annotated[
+        str | None, Header(description='"bypass" to skip the route cache')
+    ] = None,
+) -> Response:
     origin: Coordinate = request.origin
     destination: Coordinate = request.destination
-    resultJson: str = await routes_api.compute_routes(
-        origin=origin, destination=destination
+
+    # X-Route-Cache response header: hit, miss, bypass (absent if cache disabled)
+    headers: dict[str, str] = {}
+    if route_cache is not None:
+        cache_key = route_cache.key(
+            origin,
+            destination,
+            travel_mode=routes_api.TRAVEL_MODE.name,
+            profile=profile,
+        )
+        if x_route_cache == "bypass":
+            route_cache.record_bypass()
+            headers["X-Route-Cache"] = "bypass"
+        else:
+            cachedJson = route_cache.get(cache_key)
+            if cachedJson is not None:
+                headers["X-Route-Cache"] = "hit"
+                return Response(
+                    content=cachedJson, media_type="application/json", headers=headers
+                )
+            headers["X-Route-Cache"] = "miss"
+
+    if route_cache is not None:
+        # Requests answered by the same cache entry share one upstream call
+        flight_key: Hashable = cache_key
+    else:
+        flight_key = (
+            routes_api.TRAVEL_MODE.name,
+            profile,
+            origin.latitude,
+            origin.longitude,
+            destination.latitude,
+            destination.longitude,
+        )
+    resultJson: bytes = await routes_single_flight.do(
+        flight_key,
+        lambda: routes_api.compute_routes(
+            origin=origin, destination=destination, profile=profile
+        ),
     )
-    return Response(content=resultJson, media_type="application/json")
+    if route_cache is not None:
+        route_cache.put(cache_key, resultJson)
+    return Response(content=resultJson, media_type="application/json", headers=headers)
+
+
+class RouteMatrixRequest(BaseModel):
+    # Each waypoint is a coordinate or a place contentid
+    origins: list[Coordinate | int] = Field(min_length=1, max_length=50)
+    destinations: list[Coordinate | int] = Field(min_length=1, max_length=50)
+
+
+async def resolve_waypoints(
+    waypoints: list[Coordinate | int], session: AsyncSession
+) -> list[Coordinate]:
+    contentids = {w for w in waypoints if isinstance(w, int)}
+    coordinates: dict[int, Coordinate] = {}
+    if contentids:
+        statement: Select[tuple[int, float, float]] = (
+            place_queries.place_coordinates(list(contentids))
+        )
+        for contentid, longitude, latitude in await session.execute(statement):
+            coordinates[contentid] = Coordinate(longitude=longitude, latitude=latitude)
+
+    missing = contentids - coordinates.keys()
+    if missing:
+        raise HTTPException(
+            status_code=404, detail=f"Unknown contentid: {sorted(missing)}"
+        )
+    return [coordinates[w] if isinstance(w, int) else w for w in waypoints]
+
+
+@app.post("/compute_route_matrix")
+async def compute_route_matrix(
+    request: RouteMatrixRequest,
+    session: AsyncSession = Depends(db.get_async_session_yield),
+) -> StreamingResponse:
+    """NDJSON stream of matrix elements, in arrival order
+
+    Each line has originIndex and destinationIndex (indices of the request lists),
+    status, condition, distanceMeters and duration. If an upstream call fails
+    mid-stream, the last line is {"error": message} and the matrix is incomplete.
+    """
+    # Fail before the stream starts (a 200 status cannot be taken back)
+    routes_api.guard.check()
+
+    origins = await resolve_waypoints(request.origins, session)
+    destinations = await resolve_waypoints(request.destinations, session)
+
+    # Larger requests are split into concurrent upstream calls
+    elements = stream_route_matrix(
+        origins,
+        destinations,
+        max_elements=routes_api.max_matrix_elements(routes_api.TRAVEL_MODE),
+        compute_chunk=routes_api.compute_route_matrix,
+    )
+    return StreamingResponse(ndjson_lines(elements), media_type="application/x-ndjson")
+
+
+@app.get("/metrics")
+async def metrics() -> dict[str, Any]:
+    return {
+        "db_pool": db.get_pool_stats(),
+        "route_cache": route_cache.stats() if route_cache is not None else None,
+        "routes_single_flight": routes_single_flight.stats(),
+        "routes_guard": routes_api.guard.stats(),
+        "tile_cache": tile_cache.stats() if tile_cache is not None else None,
+        "tiles_single_flight": tiles_single_flight.stats(),
+    }
 
 
 @app.get("/readiness")
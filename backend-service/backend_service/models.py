@@ -1,9 +1,29 @@
+from typing import Any
+
 from pydantic import BaseModel, HttpUrl
 from pydantic_core import Url
 from pydantic_extra_types.coordinate import Coordinate, Longitude, Latitude
 
 from nyeok_database_core import tables
 
+from .place_index import SnapshotPlace
+
+
+def trusted_place(
+    contentid: int, title: str, longitude: float, latitude: float, firstimage2: str
+) -> dict[str, Any]:
+    """JSON-ready Place from trusted values (our own DB), without validation
+
+    Same as `Place(...).model_dump(mode="json")` for valid values, at a fraction of
+    the cost: response paths return these with ORJSONResponse directly.
+    """
+    return {
+        "contentid": contentid,
+        "title": title,
+        "coordinate": {"latitude": latitude, "longitude": longitude},
+        "firstimage2": firstimage2,
+    }
+
 
 class Place(BaseModel):
     contentid: int
@@ -24,3 +44,33 @@ class Place(BaseModel):
             ),
             firstimage2=Url(dbPlace.firstimage2),
         )
+
+    @staticmethod
+    def from_snapshot_place(place: SnapshotPlace):
+        return Place(
+            contentid=place.contentid,
+            title=place.title,
+            coordinate=Coordinate(
+                longitude=Longitude(place.longitude),
+                latitude=Latitude(place.latitude),
+            ),
+            firstimage2=Url(place.firstimage2),
+        )
+
+    @staticmethod
+    def trusted_from_sqlalchemy_model(
+        dbPlace: tables.Place, longitude: float, latitude: float
+    ) -> dict[str, Any]:
+        return trusted_place(
+            dbPlace.contentid, dbPlace.title, longitude, latitude, dbPlace.firstimage2
+        )
+
+    @staticmethod
+    def trusted_from_snapshot_place(place: SnapshotPlace) -> dict[str, Any]:
+        return trusted_place(
+            place.contentid,
+            place.title,
+            place.longitude,
+            place.latitude,
+            place.firstimage2,
+        )
@@ -0,0 +1,218 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from enum import StrEnum
+from typing import Any, AsyncIterator, Callable
+
+
+class OverloadedError(Exception):
+    """Outbound call rejected without being sent (shed load)"""
+
+    def __init__(self, message: str, retry_after_second: float):
+        super().__init__(message)
+        self.retry_after_second = retry_after_second
+
+
+class OutboundTimeoutError(TimeoutError):
+    """Outbound call sent but not completed before its deadline"""
+
+
+class CircuitState(StrEnum):
+    CLOSED = "closed"  # calls pass
+    OPEN = "open"  # calls are rejected until open_second elapsed
+    HALF_OPEN = "half_open"  # one trial call decides to close or reopen
+
+
+class CircuitBreaker:
+    """Opens when the failure rate of the last `window_size` calls is too high"""
+
+    def __init__(
+        self,
+        failure_rate_threshold: float = 0.5,
+        window_size: int = 20,
+        min_calls: int = 10,
+        open_second: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_rate_threshold = failure_rate_threshold
+        self.min_calls = min_calls
+        self.open_second = open_second
+        self._clock = clock
+        self._results: deque[bool] = deque(maxlen=window_size)  # True: failure
+        self._state = CircuitState.CLOSED
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self.opened = 0  # number of times the circuit opened
+
+    @property
+    def state(self) -> CircuitState:
+        if (
+            self._state == CircuitState.OPEN
+            and self._clock() - self._opened_at >= self.open_second
+        ):
+            self._state = CircuitState.HALF_OPEN
+        return self._state
+
+    def retry_after(self) -> float:
+        return max(self.open_second - (self._clock() - self._opened_at), 0.0)
+
+    def check(self) -> None:
+        """Raise OverloadedError if a call would be rejected now"""
+        state = self.state
+        if state == CircuitState.OPEN or (
+            state == CircuitState.HALF_OPEN and self._trial_in_flight
+        ):
+            raise OverloadedError("Circuit is open", self.retry_after())
+
+    def before_call(self) -> bool:
+        """Raise OverloadedError or return whether the call is the trial call"""
+        self.check()
+        if self.state == CircuitState.HALF_OPEN:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def record(self, failure: bool, trial: bool = False) -> None:
+        if trial:
+            self._trial_in_flight = False
+            self._results.clear()
+            if failure:
+                self._open()
+            else:
+                self._state = CircuitState.CLOSED
+            return
+
+        if self._state != CircuitState.CLOSED:
+            # Calls started before the circuit opened do not count
+            return
+        self._results.append(failure)
+        if (
+            len(self._results) >= self.min_calls
+            and self.failure_rate() >= self.failure_rate_threshold
+        ):
+            self._open()
+
+    def release_trial(self) -> None:
+        """The trial call ended without a result (e.g. cancelled by the caller)"""
+        self._trial_in_flight = False
+
+    def failure_rate(self) -> float:
+        if not self._results:
+            return 0.0
+        return sum(self._results) / len(self._results)
+
+    def _open(self) -> None:
+        self._state = CircuitState.OPEN
+        self._opened_at = self._clock()
+        self._results.clear()
+        self.opened += 1
+
+
+class OutboundGuard:
+    """Bounds in-flight outbound calls, their queue and duration
+
+    At most `max_concurrency` calls run at once and at most `max_queue` wait for
+    a slot; further calls are rejected immediately. `timeout_second` is the
+    deadline of one call, waiting in the queue included: OverloadedError if it
+    passes while queued, OutboundTimeoutError once sent. Failures (as judged by
+    `is_failure`) and timeouts feed the circuit breaker.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        max_queue: int,
+        timeout_second: float,
+        breaker: CircuitBreaker,
+        is_failure: Callable[[Exception], bool] = lambda _: True,
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.timeout_second = timeout_second
+        self.breaker = breaker
+        self.is_failure = is_failure
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.in_flight = 0
+        self.queued = 0
+        self.rejected = 0
+        self.timeouts = 0
+
+    def check(self) -> None:
+        """Raise OverloadedError if a call would be rejected now"""
+        try:
+            self.breaker.check()
+        except OverloadedError:
+            self.rejected += 1
+            raise
+
+    @asynccontextmanager
+    async def guarded(self) -> AsyncIterator[None]:
+        """Run the body of `async with` as one guarded outbound call"""
+        try:
+            trial = self.breaker.before_call()
+        except OverloadedError:
+            self.rejected += 1
+            raise
+
+        # From here the breaker expects a result (or a released trial)
+        recorded = False
+        started = False
+        try:
+            async with asyncio.timeout(self.timeout_second):
+                if self._semaphore.locked():
+                    if self.queued >= self.max_queue:
+                        self.rejected += 1
+                        raise OverloadedError(
+                            "Too many outbound calls", self.timeout_second
+                        )
+                    self.queued += 1
+                    try:
+                        await self._semaphore.acquire()
+                    finally:
+                        self.queued -= 1
+                else:
+                    await self._semaphore.acquire()
+
+                started = True
+                self.in_flight += 1
+                try:
+                    yield
+                except Exception as exception:
+                    self.breaker.record(self.is_failure(exception), trial)
+                    recorded = True
+                    raise
+                else:
+                    self.breaker.record(False, trial)
+                    recorded = True
+                finally:
+                    self.in_flight -= 1
+                    self._semaphore.release()
+        except TimeoutError as exception:
+            if not started:
+                # Deadline passed while queued: shed locally, upstream not involved
+                self.rejected += 1
+                raise OverloadedError(
+                    "Timed out waiting for an outbound call slot", self.timeout_second
+                ) from exception
+            self.timeouts += 1
+            if not recorded:
+                self.breaker.record(True, trial)
+                recorded = True
+            raise OutboundTimeoutError("Outbound call timed out") from exception
+        finally:
+            if trial and not recorded:
+                self.breaker.release_trial()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "circuit": self.breaker.state,
+            "circuit_opened": self.breaker.opened,
+            "failure_rate": self.breaker.failure_rate(),
+        }
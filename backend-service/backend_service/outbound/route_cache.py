@@ -0,0 +1,79 @@
+import math
+import time
+from typing import Any, Callable, Hashable
+
+from pydantic_extra_types.coordinate import Coordinate
+
+from ..lru_cache import LRUCache
+
+METER_PER_LATITUDE_DEGREE = 111_320.0
+
+
+def snap_to_grid(coordinate: Coordinate, grid_meter: float) -> tuple[int, int]:
+    """Index of the grid cell (about grid_meter x grid_meter) containing coordinate"""
+    latitude_step = grid_meter / METER_PER_LATITUDE_DEGREE
+    latitude_index = round(coordinate.latitude / latitude_step)
+
+    # Longitude degrees shrink with latitude: use the snapped latitude to stay stable
+    cos_latitude = max(math.cos(math.radians(latitude_index * latitude_step)), 1e-6)
+    longitude_index = round(coordinate.longitude / (latitude_step / cos_latitude))
+    return latitude_index, longitude_index
+
+
+class RouteCache:
+    """Caches compute_routes results of nearby origin/destination pairs
+
+    Key: (travel mode, response profile, snapped origin, snapped destination,
+    departure bucket)
+    Departure time is "now", bucketed so that entries are not reused for
+    schedules too far from the time they were computed.
+    """
+
+    def __init__(
+        self,
+        grid_meter: float,
+        departure_bucket_second: float,
+        ttl_second: float,
+        max_size: int,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.grid_meter = grid_meter
+        self.departure_bucket_second = departure_bucket_second
+        self._clock = clock
+        self._cache: LRUCache[Hashable, bytes] = LRUCache(
+            max_size=max_size, ttl_second=ttl_second, clock=clock
+        )
+        self.bypasses = 0
+
+    def key(
+        self,
+        origin: Coordinate,
+        destination: Coordinate,
+        travel_mode: str,
+        profile: str,
+    ) -> Hashable:
+        return (
+            travel_mode,
+            profile,
+            snap_to_grid(origin, self.grid_meter),
+            snap_to_grid(destination, self.grid_meter),
+            int(self._clock() // self.departure_bucket_second),
+        )
+
+    def get(self, key: Hashable) -> bytes | None:
+        return self._cache.get(key)
+
+    def put(self, key: Hashable, value: bytes) -> None:
+        self._cache.put(key, value)
+
+    def record_bypass(self) -> None:
+        self.bypasses += 1
+
+    def stats(self) -> dict[str, Any]:
+        return {**self._cache.stats(), "bypasses": self.bypasses}
+
+    def save(self, path: str) -> None:
+        self._cache.save(path)
+
+    def load(self, path: str) -> int:
+        return self._cache.load(path)
@@ -0,0 +1,107 @@
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Callable, Sequence
+
+import orjson
+from pydantic_extra_types.coordinate import Coordinate
+
+logger = logging.getLogger(__name__)
+
+# Elements (origins x destinations) of one streamed matrix call
+ComputeChunk = Callable[
+    [Sequence[Coordinate], Sequence[Coordinate]], AsyncIterator[dict[str, Any]]
+]
+
+
+def split_matrix(
+    origin_count: int, destination_count: int, max_elements: int
+) -> list[tuple[range, range]]:
+    """Split origins x destinations into blocks of at most max_elements elements
+
+    Destinations are kept together when possible so that each block has as
+    many origins as the limit allows (fewer upstream calls).
+    """
+    destination_step = min(destination_count, max_elements)
+    origin_step = max(max_elements // max(destination_step, 1), 1)
+    return [
+        (
+            range(origin_start, min(origin_start + origin_step, origin_count)),
+            range(
+                destination_start,
+                min(destination_start + destination_step, destination_count),
+            ),
+        )
+        for origin_start in range(0, origin_count, origin_step)
+        for destination_start in range(0, destination_count, destination_step)
+    ]
+
+
+async def stream_route_matrix(
+    origins: Sequence[Coordinate],
+    destinations: Sequence[Coordinate],
+    max_elements: int,
+    compute_chunk: ComputeChunk,
+) -> AsyncIterator[dict[str, Any]]:
+    """Run every block concurrently and yield elements as they arrive
+
+    originIndex / destinationIndex of each element are translated from the
+    block back to the whole request. An error in any block cancels the
+    others and is raised to the consumer.
+    """
+    blocks = split_matrix(len(origins), len(destinations), max_elements)
+    # (element, None) for each element, (None, None) when a block is done,
+    # (None, exception) when a block failed
+    queue: asyncio.Queue[tuple[dict[str, Any] | None, BaseException | None]] = (
+        asyncio.Queue()
+    )
+
+    async def run_block(origin_range: range, destination_range: range) -> None:
+        try:
+            async for element in compute_chunk(
+                [origins[i] for i in origin_range],
+                [destinations[i] for i in destination_range],
+            ):
+                element["originIndex"] = (
+                    element.get("originIndex", 0) + origin_range.start
+                )
+                element["destinationIndex"] = (
+                    element.get("destinationIndex", 0) + destination_range.start
+                )
+                queue.put_nowait((element, None))
+            queue.put_nowait((None, None))
+        except Exception as exception:
+            queue.put_nowait((None, exception))
+
+    tasks = [
+        asyncio.create_task(run_block(origin_range, destination_range))
+        for origin_range, destination_range in blocks
+    ]
+    try:
+        remaining = len(tasks)
+        while remaining > 0:
+            element, exception = await queue.get()
+            if exception is not None:
+                raise exception
+            if element is None:
+                remaining -= 1
+            else:
+                yield element
+    finally:
+        # Consumer stopped early (client disconnected) or a block failed
+        for task in tasks:
+            task.cancel()
+
+
+async def ndjson_lines(elements: AsyncIterator[dict[str, Any]]) -> AsyncIterator[bytes]:
+    """One line per element, then an {"error": ...} line if the stream failed
+
+    Once streaming, the 200 status is sent: without the error line a client
+    could not tell a truncated matrix from a complete one.
+    """
+    try:
+        async for element in elements:
+            yield orjson.dumps(element, option=orjson.OPT_APPEND_NEWLINE)
+    except Exception as exception:
+        logger.exception("Route matrix stream failed")
+        error = str(exception) or type(exception).__name__
+        yield orjson.dumps({"error": error}, option=orjson.OPT_APPEND_NEWLINE)
@@ -1,47 +1,220 @@
 # type: ignore
+import asyncio
+from enum import StrEnum
+from typing import Any, AsyncIterator, Sequence
+
+import grpc
+import orjson
 from google.maps import routing_v2
+from google.maps.routing_v2.services.routes.transports import (
+    RoutesGrpcAsyncIOTransport,
+)
 from google.type.latlng_pb2 import LatLng
-from google.protobuf.json_format import MessageToJson
+from google.protobuf.json_format import MessageToDict
 from google.api_core.client_options import ClientOptions
+from google.api_core.exceptions import ClientError, TooManyRequests
 from pydantic_extra_types.coordinate import Coordinate
 from ..env import env
+from .guard import CircuitBreaker, OutboundGuard
+
+
+# Keep the HTTP/2 connection to Google open between requests
+KEEPALIVE_OPTIONS: list[tuple[str, int]] = [
+    ("grpc.keepalive_time_ms", 30_000),
+    ("grpc.keepalive_timeout_ms", 10_000),
+    ("grpc.keepalive_permit_without_calls", 1),
+    ("grpc.http2.max_pings_without_data", 0),
+]
+
+TRAVEL_MODE = routing_v2.RouteTravelMode.TRANSIT
+
+
+class RouteProfile(StrEnum):
+    """Named response shapes of compute_routes"""
+
+    SUMMARY = "summary"  # duration, distance, polyline of each route
+    FULL = "full"  # every field (legs, steps, transit details, ...)
+
+
+# Upstream only computes and sends the fields in the mask
+FIELD_MASKS: dict[RouteProfile, str] = {
+    RouteProfile.SUMMARY: ",".join(
+        [
+            "routes.duration",
+            "routes.distanceMeters",
+            "routes.polyline.encodedPolyline",
+        ]
+    ),
+    RouteProfile.FULL: "*",
+}
+
+# status is required: without it every element appears to be OK
+MATRIX_FIELD_MASK = ",".join(
+    [
+        "originIndex",
+        "destinationIndex",
+        "status",
+        "condition",
+        "distanceMeters",
+        "duration",
+    ]
+)
+
+
+def max_matrix_elements(travel_mode: routing_v2.RouteTravelMode) -> int:
+    """Upstream limit of origins x destinations in one computeRouteMatrix call"""
+    if travel_mode == routing_v2.RouteTravelMode.TRANSIT:
+        return 100
+    return 625
+
+# Process-wide client: each uvicorn worker process creates its own
+_client: routing_v2.RoutesAsyncClient | None = None
+
+
+def is_upstream_failure(exception: Exception) -> bool:
+    """Errors caused by our request (4xx except 429) do not open the circuit"""
+    return not isinstance(exception, ClientError) or isinstance(
+        exception, TooManyRequests
+    )
+
+
+# Every upstream call of this process goes through the guard
+guard = OutboundGuard(
+    max_concurrency=env.ROUTES_MAX_CONCURRENCY,
+    max_queue=env.ROUTES_MAX_QUEUE,
+    timeout_second=env.ROUTES_TIMEOUT_SECONDS,
+    breaker=CircuitBreaker(
+        failure_rate_threshold=env.ROUTES_BREAKER_FAILURE_RATE,
+        window_size=env.ROUTES_BREAKER_WINDOW,
+        min_calls=env.ROUTES_BREAKER_WINDOW // 2,
+        open_second=env.ROUTES_BREAKER_OPEN_SECONDS,
+    ),
+    is_failure=is_upstream_failure,
+)
+
+
+def create_client(
+    api_key: str,
+    api_endpoint: str | None = None,
+    insecure: bool = False,
+) -> routing_v2.RoutesAsyncClient:
+    """Create a client whose channel uses keepalive
 
+    `api_endpoint` and `insecure` are used to connect to a local fake server.
+    """
 
-async def sample_compute_routes() -> str:
+    def create_channel(
+        host: str, options: Sequence[tuple[str, Any]] = (), **kwargs: Any
+    ) -> grpc.aio.Channel:
+        options = [*options, *KEEPALIVE_OPTIONS]
+        if insecure:
+            return grpc.aio.insecure_channel(host, options=options)
+        return RoutesGrpcAsyncIOTransport.create_channel(
+            host, options=options, **kwargs
+        )
+
+    def create_transport(**kwargs: Any) -> RoutesGrpcAsyncIOTransport:
+        return RoutesGrpcAsyncIOTransport(channel=create_channel, **kwargs)
+
+    return routing_v2.RoutesAsyncClient(
+        transport=create_transport,
+        client_options=ClientOptions(api_key=api_key, api_endpoint=api_endpoint),
+    )
+
+
+def get_client() -> routing_v2.RoutesAsyncClient:
+    """Lazily created client, reused by every request"""
+    global _client
+    if _client is None:
+        _client = create_client(api_key=env.GCP_API_KEY)
+    return _client
+
+
+async def warm_up(timeout: float = 5.0) -> None:
+    """Connect (DNS, TCP, TLS) before the first request needs the channel"""
+    channel: grpc.aio.Channel = get_client().transport.grpc_channel
+    await asyncio.wait_for(channel.channel_ready(), timeout)
+
+
+async def close_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.transport.close()
+        _client = None
+
+
+def serialize_response(response: routing_v2.ComputeRoutesResponse) -> bytes:
+    """Compact JSON (no indent), built once as bytes for the HTTP response"""
+    return orjson.dumps(MessageToDict(response._pb))
+
+
+async def sample_compute_routes() -> bytes:
     return await compute_routes(
         origin=Coordinate(latitude=36.0192418, longitude=129.3242741),
         destination=Coordinate(latitude=36.0214277, longitude=129.3370694),
     )
 
 
-async def compute_routes(origin: Coordinate, destination: Coordinate) -> str:
-    # Create a client
-    client = routing_v2.RoutesAsyncClient(
-        client_options=ClientOptions(api_key=env.GCP_API_KEY)
+def waypoint(coordinate: Coordinate) -> routing_v2.Waypoint:
+    return routing_v2.Waypoint(
+        location=routing_v2.Location(
+            lat_lng=LatLng(latitude=coordinate.latitude, longitude=coordinate.longitude)
+        )
     )
 
+
+async def compute_routes(
+    origin: Coordinate,
+    destination: Coordinate,
+    profile: RouteProfile = RouteProfile.FULL,
+    client: routing_v2.RoutesAsyncClient | None = None,
+) -> bytes:
+    if client is None:
+        client = get_client()
+
     # Initialize request argument(s)
     request = routing_v2.ComputeRoutesRequest(
-        origin=routing_v2.Waypoint(
-            location=routing_v2.Location(
-                lat_lng=LatLng(latitude=origin.latitude, longitude=origin.longitude)
-            )
-        ),
-        destination=routing_v2.Waypoint(
-            location=routing_v2.Location(
-                lat_lng=LatLng(
-                    latitude=destination.latitude, longitude=destination.longitude
-                )
-            )
-        ),
-        travel_mode=routing_v2.RouteTravelMode.TRANSIT,
+        origin=waypoint(origin),
+        destination=waypoint(destination),
+        travel_mode=TRAVEL_MODE,
     )
 
     # Make the request
-    response = await client.compute_routes(
-        request=request,
-        metadata=[("x-goog-fieldmask", "*")],
+    async with guard.guarded():
+        response = await client.compute_routes(
+            request=request,
+            metadata=[("x-goog-fieldmask", FIELD_MASKS[profile])],
+        )
+
+    return serialize_response(response)
+
+
+async def compute_route_matrix(
+    origins: Sequence[Coordinate],
+    destinations: Sequence[Coordinate],
+    client: routing_v2.RoutesAsyncClient | None = None,
+) -> AsyncIterator[dict[str, Any]]:
+    """Stream matrix elements (as dicts) in the order the server computes them
+
+    origins x destinations should be within `max_matrix_elements(TRAVEL_MODE)`.
+    """
+    if client is None:
+        client = get_client()
+
+    request = routing_v2.ComputeRouteMatrixRequest(
+        origins=[routing_v2.RouteMatrixOrigin(waypoint=waypoint(o)) for o in origins],
+        destinations=[
+            routing_v2.RouteMatrixDestination(waypoint=waypoint(d))
+            for d in destinations
+        ],
+        travel_mode=TRAVEL_MODE,
     )
 
-    resultJson = MessageToJson(response._pb)
-    return resultJson
+    # The slot and deadline cover the whole stream
+    async with guard.guarded():
+        stream = await client.compute_route_matrix(
+            request=request,
+            metadata=[("x-goog-fieldmask", MATRIX_FIELD_MASK)],
+        )
+        async for element in stream:
+            yield MessageToDict(element._pb)
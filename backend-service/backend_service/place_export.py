@@ -0,0 +1,81 @@
+"""Streaming export of the place table as NDJSON
+
+Memory stays flat however large the table is:
+* Pages are read with keyset pagination on contentid (place_queries.export_page),
+  each through a server-side cursor (`session.stream`), in partitions.
+* Each page is its own transaction: the connection goes back to the pool between
+  pages, so a slow client doesn't hold it for the whole export.
+* Lines are produced while the client reads them (and compressed on the fly).
+"""
+
+from datetime import datetime
+from typing import AsyncIterator
+import zlib
+
+import orjson
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import place_queries
+
+
+async def place_lines(
+    session: AsyncSession,
+    updated_since: datetime | None = None,
+    page_size: int = 5000,
+    partition_size: int = 500,
+) -> AsyncIterator[bytes]:
+    """NDJSON of every place (written since `updated_since`), ordered by contentid
+
+    Yields one chunk of lines per partition of rows.
+    """
+    after_contentid: int | None = None
+    while True:
+        statement = place_queries.export_page(
+            after_contentid, updated_since, page_size
+        )
+        result = await session.stream(statement)
+        count = 0
+        async for rows in result.partitions(partition_size):
+            yield b"".join(
+                orjson.dumps(row._asdict(), option=orjson.OPT_APPEND_NEWLINE)
+                for row in rows
+            )
+            count += len(rows)
+            after_contentid = rows[-1].contentid
+        await session.commit()
+
+        if count < page_size:
+            return
+
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    """Whether an Accept-Encoding header allows gzip
+
+    Codings with q=0 are refused ("gzip;q=0"), "*" stands for codings not listed.
+    Malformed q-values refuse the coding.
+    """
+    qualities: dict[str, float] = {}
+    for coding in accept_encoding.split(","):
+        name, *parameters = (part.strip() for part in coding.split(";"))
+        quality = 1.0
+        for parameter in parameters:
+            key, _, value = parameter.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if name:
+            qualities[name.lower()] = quality
+    quality = qualities.get("gzip", qualities.get("x-gzip", qualities.get("*", 0.0)))
+    return quality > 0
+
+
+async def gzip_chunks(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Chunks compressed as one gzip stream (Content-Encoding: gzip)"""
+    compressor = zlib.compressobj(wbits=31)  # 16 + 15: gzip header and trailer
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
@@ -0,0 +1,305 @@
+"""In-process snapshot of the place table for nearest / radius queries
+
+The place table is read-mostly (only `database_setup` writes it), so the backend can
+keep a copy in memory and answer nearest queries without a DB round-trip.
+
+* Rows are stored column-wise in NumPy arrays, sorted by grid cell.
+* The grid is a flat `(row, col)` bucketing of lat/lon with `cell_degree` size.
+  A query only looks at the cells overlapping the bounding box of its radius.
+  (No wrap-around at the antimeridian, which is far from Korea)
+* Filters (content type, category, area) are boolean masks over the same arrays,
+  applied to the candidates before computing distances.
+* Distances are great-circle distances on unit-sphere coordinates.
+  (PostGIS uses the spheroid, so distances may differ by up to ~0.5%)
+* A snapshot is never mutated. `PlaceIndex.refresh()` builds a new one and swaps
+  the reference, so readers always see a complete snapshot.
+"""
+
+import asyncio
+import math
+from typing import Any, Iterable, NamedTuple
+
+import numpy as np
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import place_queries
+
+EARTH_RADIUS_METER = 6_371_008.8
+# Radius large enough that scanning every row is cheaper than walking the grid
+FULL_SCAN_RADIUS_METER = 2_000_000.0
+
+
+class SnapshotRow(NamedTuple):
+    contentid: int
+    longitude: float
+    latitude: float
+    title: str
+    firstimage2: str
+    contenttypeid: int
+    areacode: int
+    cat1: str
+    cat2: str
+    cat3: str
+
+
+class SnapshotPlace(NamedTuple):
+    contentid: int
+    title: str
+    longitude: float
+    latitude: float
+    firstimage2: str
+
+
+def to_unit_vectors(longitude: np.ndarray, latitude: np.ndarray) -> np.ndarray:
+    lon = np.radians(longitude)
+    lat = np.radians(latitude)
+    cos_lat = np.cos(lat)
+    return np.column_stack((cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)))
+
+
+class PlaceSnapshot:
+    """Immutable, array-backed copy of the place table with a lat/lon grid index"""
+
+    __slots__ = (
+        "cell_degree",
+        "_columns",
+        "_keys",
+        "contentid",
+        "longitude",
+        "latitude",
+        "title",
+        "firstimage2",
+        "contenttypeid",
+        "areacode",
+        "cat1",
+        "cat2",
+        "cat3",
+        "_unit_vectors",
+    )
+
+    def __init__(
+        self,
+        contentid: np.ndarray,
+        longitude: np.ndarray,
+        latitude: np.ndarray,
+        title: list[str],
+        firstimage2: list[str],
+        contenttypeid: np.ndarray,
+        areacode: np.ndarray,
+        cat1: np.ndarray,
+        cat2: np.ndarray,
+        cat3: np.ndarray,
+        cell_degree: float = 0.05,
+    ):
+        self.cell_degree = cell_degree
+        self._columns = math.ceil(360 / cell_degree)
+
+        keys = self._cell_keys(longitude, latitude)
+        order = np.argsort(keys, kind="stable")
+
+        self._keys: np.ndarray = keys[order]
+        self.contentid: np.ndarray = contentid[order]
+        self.longitude: np.ndarray = longitude[order]
+        self.latitude: np.ndarray = latitude[order]
+        self.title: list[str] = [title[i] for i in order]
+        self.firstimage2: list[str] = [firstimage2[i] for i in order]
+        self.contenttypeid: np.ndarray = contenttypeid[order]
+        self.areacode: np.ndarray = areacode[order]
+        self.cat1: np.ndarray = cat1[order]
+        self.cat2: np.ndarray = cat2[order]
+        self.cat3: np.ndarray = cat3[order]
+        self._unit_vectors: np.ndarray = to_unit_vectors(self.longitude, self.latitude)
+
+    @staticmethod
+    def from_rows(
+        rows: Iterable[SnapshotRow], cell_degree: float = 0.05
+    ) -> "PlaceSnapshot":
+        """rows: see SnapshotRow (place_queries.snapshot_rows)"""
+        columns = list(zip(*rows)) or [()] * len(SnapshotRow._fields)
+        (
+            contentid,
+            longitude,
+            latitude,
+            title,
+            firstimage2,
+            contenttypeid,
+            areacode,
+            cat1,
+            cat2,
+            cat3,
+        ) = columns
+
+        return PlaceSnapshot(
+            contentid=np.array(contentid, dtype=np.int64),
+            longitude=np.array(longitude, dtype=np.float64),
+            latitude=np.array(latitude, dtype=np.float64),
+            title=list(title),
+            firstimage2=list(firstimage2),
+            contenttypeid=np.array(contenttypeid, dtype=np.int64),
+            areacode=np.array(areacode, dtype=np.int64),
+            # Fixed-width unicode: compared to a string without a Python loop
+            cat1=np.array(cat1, dtype=np.str_),
+            cat2=np.array(cat2, dtype=np.str_),
+            cat3=np.array(cat3, dtype=np.str_),
+            cell_degree=cell_degree,
+        )
+
+    def __len__(self) -> int:
+        return len(self.contentid)
+
+    def place(self, index: int) -> SnapshotPlace:
+        return SnapshotPlace(
+            contentid=int(self.contentid[index]),
+            title=self.title[index],
+            longitude=float(self.longitude[index]),
+            latitude=float(self.latitude[index]),
+            firstimage2=self.firstimage2[index],
+        )
+
+    def mask(self, place_filter: place_queries.PlaceFilter) -> np.ndarray | None:
+        """Rows matching place_filter (same order as the arrays), None: every row"""
+        conditions = [
+            column == value
+            for column, value in [
+                (self.contenttypeid, place_filter.content_type_id),
+                (self.cat1, place_filter.cat1),
+                (self.cat2, place_filter.cat2),
+                (self.cat3, place_filter.cat3),
+                (self.areacode, place_filter.area_code),
+            ]
+            if value is not None
+        ]
+        if not conditions:
+            return None
+        return np.logical_and.reduce(conditions)
+
+    def _cell_rows_cols(
+        self, longitude: Any, latitude: Any
+    ) -> tuple[np.ndarray, np.ndarray]:
+        rows = np.floor((np.asarray(latitude) + 90) / self.cell_degree).astype(np.int64)
+        cols = np.floor((np.asarray(longitude) + 180) / self.cell_degree).astype(
+            np.int64
+        )
+        return rows, np.clip(cols, 0, self._columns - 1)
+
+    def _cell_keys(self, longitude: np.ndarray, latitude: np.ndarray) -> np.ndarray:
+        rows, cols = self._cell_rows_cols(longitude, latitude)
+        return rows * self._columns + cols
+
+    def _candidates(
+        self, longitude: float, latitude: float, radius_meter: float
+    ) -> np.ndarray:
+        """Indices of rows in the cells overlapping the bounding box of the circle"""
+        if radius_meter >= FULL_SCAN_RADIUS_METER:
+            return np.arange(len(self))
+
+        delta_lat = math.degrees(radius_meter / EARTH_RADIUS_METER)
+        max_abs_lat = abs(latitude) + delta_lat
+        if max_abs_lat >= 90:
+            delta_lon = 180.0
+        else:
+            delta_lon = min(180.0, delta_lat / math.cos(math.radians(max_abs_lat)))
+
+        (row_min, row_max), (col_min, col_max) = self._cell_rows_cols(
+            [longitude - delta_lon, longitude + delta_lon],
+            [latitude - delta_lat, latitude + delta_lat],
+        )
+        rows = np.arange(row_min, row_max + 1, dtype=np.int64)
+        starts = np.searchsorted(self._keys, rows * self._columns + col_min, "left")
+        ends = np.searchsorted(self._keys, rows * self._columns + col_max, "right")
+
+        ranges = [np.arange(s, e) for s, e in zip(starts, ends) if s < e]
+        if not ranges:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate(ranges)
+
+    def _distances(
+        self, longitude: float, latitude: float, indices: np.ndarray
+    ) -> np.ndarray:
+        query = to_unit_vectors(np.array([longitude]), np.array([latitude]))[0]
+        chord = np.linalg.norm(self._unit_vectors[indices] - query, axis=1)
+        return 2 * EARTH_RADIUS_METER * np.arcsin(np.minimum(chord / 2, 1.0))
+
+    def radius(
+        self,
+        longitude: float,
+        latitude: float,
+        radius_meter: float,
+        mask: np.ndarray | None = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """(indices, distances) of rows within radius_meter, closest first
+
+        mask: only rows where it is True (see PlaceSnapshot.mask)
+        """
+        indices = self._candidates(longitude, latitude, radius_meter)
+        if mask is not None:
+            indices = indices[mask[indices]]
+        distances = self._distances(longitude, latitude, indices)
+
+        within = distances <= radius_meter
+        indices, distances = indices[within], distances[within]
+        order = np.argsort(distances, kind="stable")
+        return indices[order], distances[order]
+
+    def nearest(
+        self,
+        longitude: float,
+        latitude: float,
+        k: int,
+        max_distance_meter: float | None = None,
+        offset: int = 0,
+        mask: np.ndarray | None = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """(indices, distances) of the k nearest rows after skipping `offset` rows
+
+        Searches a growing radius: once `offset + k` rows are within the radius,
+        no row outside of it can be closer.
+        """
+        needed = offset + k
+        limit = max_distance_meter if max_distance_meter is not None else math.inf
+        search_radius = min(limit, self.cell_degree * 111_000)
+
+        while True:
+            indices, distances = self.radius(
+                longitude, latitude, search_radius, mask
+            )
+            if len(indices) >= needed or search_radius >= limit:
+                break
+            search_radius *= 4
+            if search_radius >= FULL_SCAN_RADIUS_METER:
+                search_radius = limit  # Scan every row (limit may be infinite)
+            search_radius = min(limit, search_radius)
+
+        return indices[offset:needed], distances[offset:needed]
+
+
+class PlaceIndex:
+    """Holds the current PlaceSnapshot, rebuilt when the place table changes"""
+
+    snapshot: PlaceSnapshot | None
+    _signature: Row[Any] | None
+
+    def __init__(self, cell_degree: float = 0.05):
+        self.cell_degree = cell_degree
+        self.snapshot = None
+        self._signature = None
+
+    async def refresh(self, session: AsyncSession) -> bool:
+        """Reload the snapshot if the table changed. Returns whether it was reloaded"""
+        signature = (
+            await session.execute(place_queries.place_table_signature())
+        ).first()
+        if self.snapshot is not None and signature == self._signature:
+            return False
+
+        rows = (await session.execute(place_queries.snapshot_rows())).tuples().all()
+        # Sorting and indexing is CPU-bound: keep the event loop responsive
+        snapshot = await asyncio.to_thread(
+            PlaceSnapshot.from_rows, rows, self.cell_degree
+        )
+
+        # Swap reference: readers keep using the previous snapshot until here
+        self.snapshot = snapshot
+        self._signature = signature
+        return True
@@ -0,0 +1,358 @@
+from datetime import datetime
+import math
+from typing import Any, NamedTuple, Sequence
+
+from geoalchemy2 import Geography, Geometry
+from geoalchemy2.functions import (
+    ST_X,
+    ST_Y,
+    ST_Distance,
+    ST_DWithin,
+    ST_Intersects,
+    ST_MakeEnvelope,
+    ST_MakePoint,
+    ST_SetSRID,
+    ST_SnapToGrid,
+)
+from sqlalchemy import (
+    ColumnElement,
+    Select,
+    TextClause,
+    cast,
+    func,
+    literal,
+    select,
+    text,
+)
+
+from nyeok_database_core.tables import Place as DBPlace
+
+
+def point_geography(longitude: float, latitude: float) -> ColumnElement[Geography]:
+    """Bound geography point (instead of WKT string) usable with `<->` and ST_DWithin"""
+    return cast(
+        ST_SetSRID(ST_MakePoint(longitude, latitude), 4326),
+        Geography("POINT", srid=4326),
+    )
+
+
+def longitude_latitude() -> tuple[ColumnElement[float], ColumnElement[float]]:
+    # cast Geography to Geometry (ST_X, ST_Y only works with Geometry)
+    geometry = cast(DBPlace.coordinate, Geometry("POINT", srid=4326))
+    return ST_X(geometry), ST_Y(geometry)
+
+
+class PlaceFilter(NamedTuple):
+    """Attributes places must have (None: any)"""
+
+    content_type_id: int | None = None
+    cat1: str | None = None
+    cat2: str | None = None
+    cat3: str | None = None
+    area_code: int | None = None
+
+    def conditions(self) -> list[ColumnElement[bool]]:
+        conditions: list[ColumnElement[bool]] = []
+        if self.content_type_id is not None:
+            # Rendered inline: a partial index predicate can't match a parameter
+            conditions.append(
+                DBPlace.contenttypeid
+                == literal(self.content_type_id, literal_execute=True)
+            )
+        if self.cat1 is not None:
+            conditions.append(DBPlace.cat1 == self.cat1)
+        if self.cat2 is not None:
+            conditions.append(DBPlace.cat2 == self.cat2)
+        if self.cat3 is not None:
+            conditions.append(DBPlace.cat3 == self.cat3)
+        if self.area_code is not None:
+            conditions.append(DBPlace.areacode == self.area_code)
+        return conditions
+
+
+def place_sample() -> Select[tuple[DBPlace, float, float]]:
+    return select(DBPlace, *longitude_latitude())
+
+
+def closest_places(
+    longitude: float,
+    latitude: float,
+    k: int,
+    max_distance_meter: float | None = None,
+    offset: int = 0,
+    place_filter: PlaceFilter = PlaceFilter(),
+) -> Select[tuple[DBPlace, float, float, float]]:
+    """K nearest places, ordered with the GiST index on `place.coordinate`
+
+    `ORDER BY coordinate <-> point LIMIT k` lets postgis walk the index instead of
+    computing the distance of every row. ST_Distance is only evaluated for the
+    returned rows, and ST_DWithin (also index-assisted) bounds the search radius.
+    The filter is part of the same query: with a content type, the walk uses the
+    partial GiST index of that type.
+    """
+    user_point = point_geography(longitude, latitude)
+
+    statement = select(
+        DBPlace,
+        *longitude_latitude(),
+        ST_Distance(DBPlace.coordinate, user_point, use_spheroid=True).label(
+            "distance"
+        ),  # type: ignore
+    )
+    if max_distance_meter is not None:
+        statement = statement.where(
+            ST_DWithin(DBPlace.coordinate, user_point, max_distance_meter)
+        )
+
+    return (
+        statement.where(*place_filter.conditions())
+        .order_by(DBPlace.coordinate.op("<->")(user_point))
+        .offset(offset)
+        .limit(k)
+    )
+
+
+def coordinate_geometry() -> ColumnElement[Any]:
+    """`place.coordinate` as geometry, the expression of its geometry GiST index"""
+    return cast(DBPlace.coordinate, Geometry("POINT", srid=4326))
+
+
+class BoundingBox(NamedTuple):
+    min_longitude: float
+    min_latitude: float
+    max_longitude: float
+    max_latitude: float
+
+
+# Zoom levels below this return clusters instead of places
+CLUSTER_BELOW_ZOOM = 14
+# Clusters per 256px tile side: one cluster marker per 64px
+CLUSTER_CELLS_PER_TILE = 4
+
+
+def cluster_cell_degree(zoom: int) -> float:
+    """Grid cell size of clusters at `zoom` (a web map tile spans 360 / 2^zoom)"""
+    return 360 / (2**zoom * CLUSTER_CELLS_PER_TILE)
+
+
+def in_bounding_box(bbox: BoundingBox) -> list[ColumnElement[bool]]:
+    """Places inside bbox, found with the GiST index on `place.coordinate::geometry`
+
+    Compared as geometry: the envelope cast to geography would have great circle
+    edges, not a longitude/latitude rectangle (a world-wide box even collapses
+    onto the antimeridian). ST_Intersects walks the expression index.
+    """
+    envelope = ST_MakeEnvelope(*bbox, 4326)
+    return [ST_Intersects(coordinate_geometry(), envelope)]
+
+
+def places_in_bounding_box(
+    bbox: BoundingBox, limit: int, place_filter: PlaceFilter = PlaceFilter()
+) -> Select[tuple[DBPlace, float, float]]:
+    """At most `limit` places inside bbox (ordered by contentid)"""
+    return (
+        select(DBPlace, *longitude_latitude())
+        .where(*in_bounding_box(bbox), *place_filter.conditions())
+        .order_by(DBPlace.contentid)
+        .limit(limit)
+    )
+
+
+def place_clusters_in_bounding_box(
+    bbox: BoundingBox,
+    cell_degree: float,
+    limit: int,
+    place_filter: PlaceFilter = PlaceFilter(),
+) -> Select[tuple[int, float, float, int]]:
+    """(count, longitude, latitude, contentid) of places grouped by grid cell
+
+    longitude/latitude are the centroid of the places of the cell, contentid the
+    smallest of them (the place itself when count is 1). At most `limit` clusters
+    are returned, the largest first: a wide box at a high zoom has many cells.
+    """
+    longitude, latitude = longitude_latitude()
+    geometry = coordinate_geometry()
+    return (
+        select(
+            func.count(),
+            func.avg(longitude),
+            func.avg(latitude),
+            func.min(DBPlace.contentid),
+        )
+        .where(*in_bounding_box(bbox), *place_filter.conditions())
+        .group_by(ST_SnapToGrid(geometry, cell_degree))
+        .order_by(func.count().desc(), func.min(DBPlace.contentid))
+        .limit(limit)
+    )
+
+
+# Mapbox Vector Tile: coordinates in [0, TILE_EXTENT), points kept TILE_BUFFER
+# beyond the edges so that markers crossing them are drawn by both tiles
+TILE_EXTENT = 4096
+TILE_BUFFER = 64
+TILE_LAYER = "places"
+WEB_MERCATOR_WIDTH = 2 * 20037508.342789244  # Meters, the tile at zoom 0
+
+
+def tile_bounding_box(z: int, x: int, y: int, margin: float = 0) -> BoundingBox:
+    """Longitude/latitude box of tile z/x/y, widened by `margin` tile sides
+
+    Clamped to the world: the margin of tiles on the edge of the map doesn't
+    wrap around the antimeridian.
+    """
+    tiles = 2**z
+
+    def longitude(tile_x: float) -> float:
+        return min(max(tile_x / tiles * 360 - 180, -180), 180)
+
+    def latitude(tile_y: float) -> float:
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * tile_y / tiles))))
+
+    return BoundingBox(
+        longitude(x - margin),
+        latitude(y + 1 + margin),
+        longitude(x + 1 + margin),
+        latitude(y - margin),
+    )
+
+
+def place_tile(z: int, x: int, y: int) -> TextClause:
+    """MVT of the places in tile z/x/y (a bytea), clusters below CLUSTER_BELOW_ZOOM
+
+    Places are found in the longitude/latitude box of the tile (with its buffer)
+    on geometry, like in_bounding_box, through the GiST index on
+    `place.coordinate::geometry`. Clusters are counted on a grid aligned with the
+    tile, and only from places inside it, so that a cluster is drawn by one tile
+    only.
+    """
+    params: dict[str, Any] = dict(
+        z=z,
+        x=x,
+        y=y,
+        extent=TILE_EXTENT,
+        buffer=TILE_BUFFER,
+        layer=TILE_LAYER,
+        **tile_bounding_box(z, x, y, TILE_BUFFER / TILE_EXTENT)._asdict(),
+    )
+    if z < CLUSTER_BELOW_ZOOM:
+        params["cell"] = WEB_MERCATOR_WIDTH / (2**z * CLUSTER_CELLS_PER_TILE)
+        features = """
+            SELECT
+                ST_AsMVTGeom(
+                    ST_Centroid(ST_Collect(places.geometry)),
+                    bounds.tile, :extent, :buffer
+                ) AS geom,
+                count(*) AS count,
+                min(places.contentid) AS contentid
+            FROM places, bounds
+            WHERE ST_Intersects(places.geometry, bounds.tile)
+            GROUP BY
+                floor(ST_X(places.geometry) / :cell),
+                floor(ST_Y(places.geometry) / :cell),
+                bounds.tile
+        """
+    else:
+        features = """
+            SELECT
+                ST_AsMVTGeom(places.geometry, bounds.tile, :extent, :buffer) AS geom,
+                1 AS count,
+                places.contentid,
+                places.title,
+                places.firstimage2,
+                places.contenttypeid,
+                places.cat1
+            FROM places, bounds
+        """
+    return text(
+        f"""
+        WITH bounds AS (
+            SELECT ST_TileEnvelope(:z, :x, :y) AS tile
+        ),
+        places AS (
+            SELECT
+                ST_Transform(CAST(place.coordinate AS geometry), 3857) AS geometry,
+                place.*
+            FROM {DBPlace.__tablename__} AS place
+            WHERE ST_Intersects(
+                CAST(place.coordinate AS geometry(POINT,4326)),
+                ST_MakeEnvelope(
+                    :min_longitude, :min_latitude, :max_longitude, :max_latitude, 4326
+                )
+            )
+        ),
+        features AS ({features})
+        SELECT ST_AsMVT(features, :layer, :extent, 'geom') FROM features
+        """
+    ).bindparams(**params)
+
+
+def export_page(
+    after_contentid: int | None, updated_since: datetime | None, limit: int
+) -> Select[tuple[Any, ...]]:
+    """Next `limit` places after after_contentid (keyset pagination on the pkey)
+
+    Unlike OFFSET, each page is an index range scan starting where the previous
+    page stopped, so pages cost the same however deep the export is.
+    """
+    longitude, latitude = longitude_latitude()
+    statement = select(
+        DBPlace.contentid,
+        DBPlace.title,
+        longitude.label("longitude"),
+        latitude.label("latitude"),
+        DBPlace.firstimage2,
+        DBPlace.areacode,
+        DBPlace.sigungucode,
+        DBPlace.contenttypeid,
+        DBPlace.cat1,
+        DBPlace.cat2,
+        DBPlace.cat3,
+        DBPlace.modifiedtime,
+        DBPlace.updated_at,
+    )
+    if after_contentid is not None:
+        statement = statement.where(DBPlace.contentid > after_contentid)
+    if updated_since is not None:
+        statement = statement.where(DBPlace.updated_at >= updated_since)
+    return statement.order_by(DBPlace.contentid).limit(limit)
+
+
+def snapshot_rows() -> (
+    Select[tuple[int, float, float, str, str, int, int, str, str, str]]
+):
+    """Columns kept by the in-process PlaceIndex"""
+    return select(
+        DBPlace.contentid,
+        *longitude_latitude(),
+        DBPlace.title,
+        DBPlace.firstimage2,
+        DBPlace.contenttypeid,
+        DBPlace.areacode,
+        DBPlace.cat1,
+        DBPlace.cat2,
+        DBPlace.cat3,
+    )
+
+
+def place_table_signature() -> TextClause:
+    """Cheap change detector for the place table (no table scan)
+
+    Statistics counters change whenever rows are inserted, updated or deleted,
+    and relid changes when the table is replaced.
+    """
+    return text(
+        """
+        SELECT relid, n_tup_ins, n_tup_upd, n_tup_del
+        FROM pg_stat_user_tables
+        WHERE schemaname = 'public' AND relname = :table_name
+        """
+    ).bindparams(table_name=DBPlace.__tablename__)
+
+
+def place_coordinates(
+    contentids: Sequence[int],
+) -> Select[tuple[int, float, float]]:
+    """(contentid, longitude, latitude) of the given places"""
+    return select(DBPlace.contentid, *longitude_latitude()).where(
+        DBPlace.contentid.in_(contentids)
+    )
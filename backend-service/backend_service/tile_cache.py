@@ -0,0 +1,61 @@
+from typing import Any, Hashable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from nyeok_database_core import data_version
+
+from .lru_cache import LRUCache
+
+
+class TileCache:
+    """Vector tiles of the place table, keyed by (data version, z, x, y)
+
+    The data version is bumped by `database_setup` whenever it writes the table
+    (nyeok_database_core.data_version). Tiles of an older version are never hit
+    again: they are dropped when a new version is seen. Until the version is
+    known (e.g. the data_version row doesn't exist yet), nothing is cached.
+    """
+
+    def __init__(self, max_size: int):
+        self._cache: LRUCache[Hashable, bytes] = LRUCache(max_size=max_size)
+        self.version: int | None = None
+        self.invalidations = 0
+
+    def key(self, z: int, x: int, y: int) -> Hashable | None:
+        if self.version is None:
+            return None
+        return (self.version, z, x, y)
+
+    def get(self, key: Hashable) -> bytes | None:
+        return self._cache.get(key)
+
+    def put(self, key: Hashable, tile: bytes) -> None:
+        self._cache.put(key, tile)
+
+    def set_version(self, version: int | None) -> bool:
+        """Returns whether the version changed (cached tiles are dropped)"""
+        if version == self.version:
+            return False
+        if self.version is not None:
+            self._cache.clear()
+            self.invalidations += 1
+        self.version = version
+        return True
+
+    async def refresh_version(self, session: AsyncSession) -> bool:
+        version = (await session.execute(data_version.current())).scalar()
+        return self.set_version(version)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            **self._cache.stats(),
+            "version": self.version,
+            "invalidations": self.invalidations,
+        }
+
+    def save(self, path: str) -> None:
+        self._cache.save(path)
+
+    def load(self, path: str) -> int:
+        """Entries of another version are loaded too, but never hit (LRU evicts them)"""
+        return self._cache.load(path)
@@ -0,0 +1,81 @@
+"""Cost of building and serializing a PlacesResult, per 1,000 places
+
+* model: Place.from_snapshot_place, then what FastAPI does with a returned model
+  (validate against response_model, serialize to JSON-compatible, json.dumps)
+* trusted: Place.trusted_from_snapshot_place dicts with orjson (ORJSONResponse)
+
+Usage (from backend-service/, with the backend env loadable):
+    python -m benchmarks.place_serialization --places 1000
+"""
+
+import argparse
+import json
+import timeit
+from typing import Any
+
+import orjson
+from pydantic import TypeAdapter
+
+from backend_service.main import PlaceAndDistance, PlacesResult
+from backend_service.models import Place
+from backend_service.place_index import SnapshotPlace
+
+ADAPTER = TypeAdapter(PlacesResult)
+
+
+def build_places(count: int) -> list[SnapshotPlace]:
+    return [
+        SnapshotPlace(
+            contentid=100000 + i,
+            title=f"관광지 {i}",
+            longitude=126.9 + i * 1e-5,
+            latitude=37.5 + i * 1e-5,
+            firstimage2=f"http://tong.visitkorea.or.kr/cms/resource/{i}_image3_1.jpg",
+        )
+        for i in range(count)
+    ]
+
+
+def model_response(places: list[SnapshotPlace]) -> bytes:
+    result = PlacesResult(
+        place_and_distance_list=[
+            PlaceAndDistance(place=Place.from_snapshot_place(p), distance_meter=1.0)
+            for p in places
+        ]
+    )
+    # fastapi.routing.serialize_response, then JSONResponse.render
+    value = ADAPTER.validate_python(result.model_dump())
+    content: Any = ADAPTER.dump_python(value, mode="json")
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def trusted_response(places: list[SnapshotPlace]) -> bytes:
+    return orjson.dumps(
+        {
+            "place_and_distance_list": [
+                {"place": Place.trusted_from_snapshot_place(p), "distance_meter": 1.0}
+                for p in places
+            ]
+        }
+    )
+
+
+def main(count: int, number: int) -> None:
+    places = build_places(count)
+    assert orjson.loads(model_response(places)) == orjson.loads(
+        trusted_response(places)
+    )
+    per_thousand = 1000 / count
+    for name, response in [("model", model_response), ("trusted", trusted_response)]:
+        second = timeit.timeit(lambda: response(places), number=number)
+        print(f"{name:<8} {second / number * 1e3 * per_thousand:8.2f} ms / 1000 places")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--places", type=int, default=1000)
+    parser.add_argument("--number", type=int, default=50)
+    args = parser.parse_args()
+    main(args.places, args.number)
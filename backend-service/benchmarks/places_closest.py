@@ -0,0 +1,169 @@
+"""Latency of /places_closest queries against synthetic place tables
+
+Compares the previous query (ST_Distance of every row, ORDER BY, `.all()[:3]`)
+with the index-assisted KNN query (`ORDER BY coordinate <-> point LIMIT k`).
+
+Rows are generated inside a TEMP TABLE named `place`, which shadows `public.place`
+for the benchmark session only. Nothing is written to the real table.
+
+Usage (from backend-service/):
+    python -m benchmarks.places_closest --sizes 10000 100000 1000000
+"""
+
+import argparse
+import random
+import statistics
+import time
+from typing import Callable
+
+from geoalchemy2 import Geometry
+from geoalchemy2.functions import ST_X, ST_Y, ST_Distance
+from sqlalchemy import Select, cast, select, text
+from sqlalchemy.orm import Session
+
+from nyeok_database_core import db
+from nyeok_database_core.tables import Place as DBPlace
+
+from backend_service import place_queries
+
+# Bounding box of South Korea
+MIN_LON, MAX_LON = 124.6, 131.9
+MIN_LAT, MAX_LAT = 33.1, 38.6
+
+
+def legacy_statement(longitude: float, latitude: float) -> Select:
+    return select(
+        DBPlace,
+        ST_X(cast(DBPlace.coordinate, Geometry("POINT", srid=4326))),
+        ST_Y(cast(DBPlace.coordinate, Geometry("POINT", srid=4326))),
+        ST_Distance(
+            DBPlace.coordinate,
+            f"POINT({longitude} {latitude})",
+            use_spheroid=True,
+        ).label(
+            "distance"
+        ),  # type: ignore
+    ).order_by("distance")
+
+
+def fill_temp_place_table(session: Session, size: int) -> None:
+    session.execute(text("CREATE TEMP TABLE place (LIKE public.place INCLUDING ALL)"))
+    session.execute(
+        text(
+            """
+            INSERT INTO place (
+                contentid, title, coordinate, firstimage2,
+                areacode, sigungucode, modifiedtime,
+                contenttypeid, cat1, cat2, cat3
+            )
+            SELECT
+                i,
+                'place ' || i,
+                ST_SetSRID(
+                    ST_MakePoint(
+                        :min_lon + random() * (:max_lon - :min_lon),
+                        :min_lat + random() * (:max_lat - :min_lat)
+                    ),
+                    4326
+                )::geography,
+                'http://tong.visitkorea.or.kr/cms/resource/00/0000000_image3_1.jpg',
+                1,
+                1,
+                now(),
+                (ARRAY[12, 14, 15, 25, 28, 32, 38, 39])[1 + i % 8],
+                'A01',
+                'A0101',
+                'A01010100'
+            FROM generate_series(1, :size) AS i
+            """
+        ),
+        dict(
+            size=size,
+            min_lon=MIN_LON,
+            max_lon=MAX_LON,
+            min_lat=MIN_LAT,
+            max_lat=MAX_LAT,
+        ),
+    )
+    session.execute(text("ANALYZE place"))
+
+
+def measure(
+    session: Session,
+    run_query: Callable[[Session, float, float], object],
+    repeat: int,
+) -> tuple[float, float]:
+    """Returns (p50, p99) in milliseconds"""
+    latencies: list[float] = []
+    for _ in range(repeat):
+        longitude = random.uniform(MIN_LON, MAX_LON)
+        latitude = random.uniform(MIN_LAT, MAX_LAT)
+        start = time.perf_counter()
+        run_query(session, longitude, latitude)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    percentiles = statistics.quantiles(latencies, n=100)
+    return percentiles[49], percentiles[98]
+
+
+def run_legacy(session: Session, longitude: float, latitude: float) -> object:
+    return session.execute(legacy_statement(longitude, latitude)).all()[:3]
+
+
+def run_knn(session: Session, longitude: float, latitude: float) -> object:
+    return session.execute(
+        place_queries.closest_places(longitude, latitude, k=3)
+    ).all()
+
+
+def run_knn_with_radius(session: Session, longitude: float, latitude: float) -> object:
+    return session.execute(
+        place_queries.closest_places(
+            longitude, latitude, k=3, max_distance_meter=5000
+        )
+    ).all()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=5432)
+    parser.add_argument("--user", default="superuser")
+    parser.add_argument("--password", default="password")
+    parser.add_argument("--database", default="database")
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument(
+        "--legacy-repeat",
+        type=int,
+        default=20,
+        help="The legacy query scans the whole table, so run it fewer times",
+    )
+    args = parser.parse_args()
+
+    db.setup(
+        username=args.user,
+        password=args.password,
+        hostname=args.host,
+        port=args.port,
+        databasename=args.database,
+    )
+
+    print(f"{'rows':>10} {'query':<18} {'p50 ms':>10} {'p99 ms':>10}")
+    for size in args.sizes:
+        with db.get_session_with() as session:
+            fill_temp_place_table(session, size)
+            for name, run_query, repeat in [
+                ("legacy(sort all)", run_legacy, args.legacy_repeat),
+                ("knn k=3", run_knn, args.repeat),
+                ("knn k=3 r=5km", run_knn_with_radius, args.repeat),
+            ]:
+                p50, p99 = measure(session, run_query, repeat)
+                print(f"{size:>10} {name:<18} {p50:>10.2f} {p99:>10.2f}")
+            session.rollback()  # Drops the temp table
+
+
+if __name__ == "__main__":
+    main()
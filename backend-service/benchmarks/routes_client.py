@@ -0,0 +1,95 @@
+"""Latency of compute_routes with a new client per call (cold) vs a reused client (warm)
+
+Runs against a local fake Routes gRPC server, so only client-side costs are measured:
+client/transport construction, channel setup and connection establishment.
+The fake server is plaintext, so the TLS handshake paid by a cold call against
+routes.googleapis.com comes on top of the cold numbers here.
+
+Usage (from backend-service/, with the backend env loadable):
+    python -m benchmarks.routes_client --calls 200
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import grpc
+from google.maps.routing_v2.types import route, routes_service
+from pydantic_extra_types.coordinate import Coordinate
+
+from backend_service.outbound import routes_api
+
+ORIGIN = Coordinate(latitude=36.0192418, longitude=129.3242741)
+DESTINATION = Coordinate(latitude=36.0214277, longitude=129.3370694)
+
+
+async def fake_compute_routes(
+    request: routes_service.ComputeRoutesRequest, context: grpc.aio.ServicerContext
+) -> routes_service.ComputeRoutesResponse:
+    return routes_service.ComputeRoutesResponse(
+        routes=[route.Route(distance_meters=1234, duration="600s")]
+    )
+
+
+async def start_fake_server() -> tuple[grpc.aio.Server, int]:
+    server = grpc.aio.server()
+    server.add_generic_rpc_handlers(
+        [
+            grpc.method_handlers_generic_handler(
+                "google.maps.routing.v2.Routes",
+                {
+                    "ComputeRoutes": grpc.unary_unary_rpc_method_handler(
+                        fake_compute_routes,
+                        request_deserializer=routes_service.ComputeRoutesRequest.deserialize,
+                        response_serializer=routes_service.ComputeRoutesResponse.serialize,
+                    )
+                },
+            )
+        ]
+    )
+    port = server.add_insecure_port("127.0.0.1:0")
+    await server.start()
+    return server, port
+
+
+def summary(name: str, latencies: list[float]) -> str:
+    percentiles = statistics.quantiles(latencies, n=100)
+    return (
+        f"{name:<6} mean {statistics.mean(latencies):8.2f} ms"
+        f"  p50 {percentiles[49]:8.2f} ms  p99 {percentiles[98]:8.2f} ms"
+    )
+
+
+async def main(calls: int) -> None:
+    server, port = await start_fake_server()
+    endpoint = f"127.0.0.1:{port}"
+
+    cold: list[float] = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        client = routes_api.create_client("fake-key", endpoint, insecure=True)
+        await routes_api.compute_routes(ORIGIN, DESTINATION, client=client)
+        cold.append((time.perf_counter() - start) * 1000)
+        await client.transport.close()
+
+    warm: list[float] = []
+    client = routes_api.create_client("fake-key", endpoint, insecure=True)
+    await routes_api.compute_routes(ORIGIN, DESTINATION, client=client)
+    for _ in range(calls):
+        start = time.perf_counter()
+        await routes_api.compute_routes(ORIGIN, DESTINATION, client=client)
+        warm.append((time.perf_counter() - start) * 1000)
+    await client.transport.close()
+
+    await server.stop(grace=None)
+
+    print(summary("cold", cold))
+    print(summary("warm", warm))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.calls))
@@ -0,0 +1,83 @@
+"""Cost of serializing a compute_routes response: MessageToJson vs serialize_response
+
+Builds a transit-like response in memory (no network) with every field set
+(profile "full") and with only the fields of the "summary" field mask.
+
+Usage (from backend-service/, with the backend env loadable):
+    python -m benchmarks.routes_serialization --routes 3 --steps 40
+"""
+
+import argparse
+import timeit
+
+from google.maps import routing_v2
+from google.protobuf.json_format import MessageToJson
+
+from backend_service.outbound import routes_api
+
+POLYLINE = "ozq{E}wqhWeAcB}@wA" * 20
+
+
+def build_response(
+    routes: int, steps: int, full: bool
+) -> routing_v2.ComputeRoutesResponse:
+    def build_route() -> routing_v2.Route:
+        summary = routing_v2.Route(
+            distance_meters=12345,
+            duration="1800s",
+            polyline=routing_v2.Polyline(encoded_polyline=POLYLINE),
+        )
+        if not full:
+            return summary
+        summary.legs = [
+            routing_v2.RouteLeg(
+                distance_meters=12345,
+                duration="1800s",
+                polyline=routing_v2.Polyline(encoded_polyline=POLYLINE),
+                steps=[
+                    routing_v2.RouteLegStep(
+                        distance_meters=300,
+                        static_duration="60s",
+                        polyline=routing_v2.Polyline(encoded_polyline=POLYLINE[:40]),
+                        navigation_instruction=routing_v2.NavigationInstruction(
+                            instructions="Walk to the bus stop"
+                        ),
+                    )
+                    for _ in range(steps)
+                ],
+            )
+        ]
+        return summary
+
+    return routing_v2.ComputeRoutesResponse(
+        routes=[build_route() for _ in range(routes)]
+    )
+
+
+def main(routes: int, steps: int, number: int) -> None:
+    for profile in routes_api.RouteProfile:
+        full = profile == routes_api.RouteProfile.FULL
+        response = build_response(routes, steps, full=full)
+        pretty = MessageToJson(response._pb)
+        compact = routes_api.serialize_response(response)
+        pretty_second = timeit.timeit(
+            lambda: MessageToJson(response._pb), number=number
+        )
+        compact_second = timeit.timeit(
+            lambda: routes_api.serialize_response(response), number=number
+        )
+        print(
+            f"{profile:<8} MessageToJson {pretty_second / number * 1e6:9.1f} us"
+            f" {len(pretty.encode()):8} bytes"
+            f" | serialize_response {compact_second / number * 1e6:9.1f} us"
+            f" {len(compact):8} bytes"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--routes", type=int, default=3)
+    parser.add_argument("--steps", type=int, default=40)
+    parser.add_argument("--number", type=int, default=200)
+    args = parser.parse_args()
+    main(args.routes, args.steps, args.number)
@@ -0,0 +1,148 @@
+import asyncio
+
+import pytest
+
+from backend_service.outbound.guard import (
+    CircuitBreaker,
+    CircuitState,
+    OutboundGuard,
+    OutboundTimeoutError,
+    OverloadedError,
+)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_breaker_opens_and_recovers():
+    clock = FakeClock()
+    breaker = CircuitBreaker(
+        failure_rate_threshold=0.5,
+        window_size=4,
+        min_calls=4,
+        open_second=30,
+        clock=clock,
+    )
+    for failure in [False, True, False, True]:
+        breaker.before_call()
+        breaker.record(failure)
+    assert breaker.state == CircuitState.OPEN
+    with pytest.raises(OverloadedError):
+        breaker.check()
+
+    clock.now += 30
+    assert breaker.before_call() is True  # trial call
+    with pytest.raises(OverloadedError):
+        breaker.before_call()  # only one trial at a time
+    breaker.record(False, trial=True)
+    assert breaker.state == CircuitState.CLOSED
+
+
+def test_breaker_reopens_after_failed_trial():
+    clock = FakeClock()
+    breaker = CircuitBreaker(window_size=2, min_calls=2, open_second=10, clock=clock)
+    for _ in range(2):
+        breaker.record(True)
+    clock.now += 10
+    breaker.record(True, trial=breaker.before_call())
+    assert breaker.state == CircuitState.OPEN
+    assert breaker.opened == 2
+
+
+def guard(max_concurrency: int = 1, max_queue: int = 1, timeout_second: float = 1.0):
+    return OutboundGuard(
+        max_concurrency=max_concurrency,
+        max_queue=max_queue,
+        timeout_second=timeout_second,
+        breaker=CircuitBreaker(window_size=4, min_calls=4),
+    )
+
+
+def test_guard_rejects_when_queue_is_full():
+    async def main() -> None:
+        outbound = guard(max_concurrency=1, max_queue=1)
+        release = asyncio.Event()
+
+        async def call() -> None:
+            async with outbound.guarded():
+                await release.wait()
+
+        running = asyncio.create_task(call())
+        queued = asyncio.create_task(call())
+        await asyncio.sleep(0)
+        assert outbound.stats()["in_flight"] == 1
+        assert outbound.stats()["queued"] == 1
+
+        with pytest.raises(OverloadedError):
+            await call()
+        assert outbound.stats()["rejected"] == 1
+
+        release.set()
+        await asyncio.gather(running, queued)
+        assert outbound.stats()["in_flight"] == 0
+
+    asyncio.run(main())
+
+
+def test_guard_deadline_while_queued_is_overload():
+    async def main() -> None:
+        outbound = guard(max_concurrency=1, max_queue=1)
+        release = asyncio.Event()
+
+        async def call() -> None:
+            async with outbound.guarded():
+                await release.wait()
+
+        running = asyncio.create_task(call())
+        await asyncio.sleep(0)
+        outbound.timeout_second = 0.01  # Only for the queued call
+        with pytest.raises(OverloadedError):
+            await call()
+        assert outbound.stats()["rejected"] == 1
+        assert outbound.stats()["queued"] == 0
+
+        release.set()
+        await running
+
+    asyncio.run(main())
+
+
+def test_guard_deadline_counts_as_failure():
+    async def main() -> None:
+        outbound = guard(timeout_second=0.01)
+        for _ in range(4):
+            with pytest.raises(OutboundTimeoutError):
+                async with outbound.guarded():
+                    await asyncio.sleep(1)
+
+        assert outbound.stats()["timeouts"] == 4
+        assert outbound.stats()["circuit"] == CircuitState.OPEN
+        with pytest.raises(OverloadedError):
+            async with outbound.guarded():
+                pass
+
+    asyncio.run(main())
+
+
+def test_guard_ignores_errors_not_caused_by_upstream():
+    async def main() -> None:
+        outbound = OutboundGuard(
+            max_concurrency=1,
+            max_queue=0,
+            timeout_second=1.0,
+            breaker=CircuitBreaker(window_size=2, min_calls=2),
+            is_failure=lambda exception: not isinstance(exception, ValueError),
+        )
+        for _ in range(2):
+            with pytest.raises(ValueError):
+                async with outbound.guarded():
+                    raise ValueError("bad request")
+
+        assert outbound.stats()["circuit"] == CircuitState.CLOSED
+
+    asyncio.run(main())
@@ -0,0 +1,14 @@
+from backend_service.models import Place
+from backend_service.place_index import SnapshotPlace
+
+
+def test_trusted_place_matches_model():
+    place = SnapshotPlace(
+        contentid=126508,
+        title="경복궁",
+        longitude=126.9769930325,
+        latitude=37.5788222356,
+        firstimage2="http://tong.visitkorea.or.kr/cms/resource/33/2678633_image3_1.jpg",
+    )
+    model = Place.from_snapshot_place(place).model_dump(mode="json")
+    assert Place.trusted_from_snapshot_place(place) == model
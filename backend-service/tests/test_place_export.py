@@ -0,0 +1,120 @@
+import asyncio
+from datetime import datetime, timezone
+import gzip
+from typing import Any, AsyncIterator, NamedTuple
+
+import orjson
+
+from backend_service import place_export, place_queries
+
+from .test_place_queries import to_sql
+
+
+class ExportRow(NamedTuple):
+    contentid: int
+    title: str
+
+
+class FakeResult:
+    def __init__(self, rows: list[ExportRow]):
+        self.rows = rows
+
+    async def partitions(self, size: int) -> AsyncIterator[list[ExportRow]]:
+        for start in range(0, len(self.rows), size):
+            yield self.rows[start : start + size]
+
+
+class Page(NamedTuple):
+    """Arguments of place_queries.export_page, in place of the statement"""
+
+    after_contentid: int | None
+    updated_since: datetime | None
+    limit: int
+
+
+class FakeSession:
+    """Serves pages of `table` like export_page, recording every page asked"""
+
+    def __init__(self, table: list[ExportRow]):
+        self.table = table
+        self.pages: list[Page] = []
+        self.commits = 0
+
+    async def stream(self, page: Page) -> FakeResult:
+        self.pages.append(page)
+        after = page.after_contentid or 0
+        rows = [row for row in self.table if row.contentid > after]
+        return FakeResult(rows[: page.limit])
+
+    async def commit(self) -> None:
+        self.commits += 1
+
+
+def export(session: FakeSession, **kwargs: Any) -> bytes:
+    async def run() -> bytes:
+        chunks = place_export.place_lines(session, **kwargs)  # type: ignore[arg-type]
+        return b"".join([chunk async for chunk in chunks])
+
+    return asyncio.run(run())
+
+
+def test_place_lines_keyset_pages(monkeypatch):
+    monkeypatch.setattr(place_queries, "export_page", Page)
+    table = [ExportRow(contentid, f"place {contentid}") for contentid in range(1, 8)]
+    session = FakeSession(table)
+    since = datetime(2024, 9, 17)
+
+    body = export(session, updated_since=since, page_size=3, partition_size=2)
+
+    lines = [orjson.loads(line) for line in body.splitlines()]
+    assert lines == [row._asdict() for row in table]
+    # 3 + 3 + 1 rows: each page starts after the last contentid of the previous
+    # one, the short page ends the export; a transaction per page
+    assert session.pages == [Page(None, since, 3), Page(3, since, 3), Page(6, since, 3)]
+    assert session.commits == 3
+
+
+def test_place_lines_full_last_page(monkeypatch):
+    monkeypatch.setattr(place_queries, "export_page", Page)
+    table = [ExportRow(contentid, f"place {contentid}") for contentid in range(1, 7)]
+    session = FakeSession(table)
+
+    assert len(export(session, page_size=3).splitlines()) == 6
+    # An empty page tells the table is exhausted
+    assert session.pages[-1] == Page(6, None, 3)
+
+
+def test_export_page():
+    since = datetime(2024, 9, 17, 15, 30, 12, tzinfo=timezone.utc)
+    sql = to_sql(place_queries.export_page(None, since, 100))
+    # When the row was written, not modifiedtime of TourAPI
+    assert "WHERE place.updated_at >= '2024-09-17 15:30:12+00:00'" in sql
+    assert "place.modifiedtime >=" not in sql
+    assert sql.endswith("ORDER BY place.contentid \n LIMIT 100")
+
+    sql = to_sql(place_queries.export_page(6, None, 100))
+    assert "place.contentid > 6" in sql
+
+
+def test_gzip_chunks():
+    chunks = [b'{"contentid":1}\n', b"", b'{"contentid":2}\n']
+
+    async def source() -> AsyncIterator[bytes]:
+        for chunk in chunks:
+            yield chunk
+
+    async def run() -> bytes:
+        return b"".join([c async for c in place_export.gzip_chunks(source())])
+
+    assert gzip.decompress(asyncio.run(run())) == b"".join(chunks)
+
+
+def test_accepts_gzip():
+    assert place_export.accepts_gzip("gzip, deflate, br")
+    assert place_export.accepts_gzip("br;q=1.0, gzip;q=0.8")
+    assert place_export.accepts_gzip("*")
+    assert not place_export.accepts_gzip("")
+    assert not place_export.accepts_gzip("identity")
+    assert not place_export.accepts_gzip("gzip;q=0")
+    assert not place_export.accepts_gzip("gzip; q=0.000, *;q=1")
+    assert not place_export.accepts_gzip("*, gzip;q=0")
@@ -0,0 +1,125 @@
+import math
+import random
+
+import numpy as np
+
+from backend_service.place_index import EARTH_RADIUS_METER, PlaceSnapshot
+from backend_service.place_queries import PlaceFilter
+
+
+def haversine(lon1: float, lat1: float, lon2: float, lat2: float) -> float:
+    lon1, lat1, lon2, lat2 = map(math.radians, (lon1, lat1, lon2, lat2))
+    a = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_METER * math.asin(math.sqrt(a))
+
+
+def get_snapshot(size: int = 2000) -> PlaceSnapshot:
+    rng = random.Random(0)
+    rows = [
+        (
+            contentid,
+            rng.uniform(124.6, 131.9),
+            rng.uniform(33.1, 38.6),
+            f"place {contentid}",
+            f"http://example.com/{contentid}.jpg",
+            [12, 39][contentid % 2],
+            1 + contentid % 3,
+            "A01",
+            "A0101",
+            f"A010101{contentid % 5:02d}",
+        )
+        for contentid in range(size)
+    ]
+    return PlaceSnapshot.from_rows(rows)
+
+
+def brute_force(
+    snapshot: PlaceSnapshot, longitude: float, latitude: float
+) -> list[tuple[float, int]]:
+    return sorted(
+        (
+            haversine(longitude, latitude, snapshot.longitude[i], snapshot.latitude[i]),
+            int(snapshot.contentid[i]),
+        )
+        for i in range(len(snapshot))
+    )
+
+
+def test_nearest_matches_brute_force():
+    snapshot = get_snapshot()
+    for longitude, latitude in [(126.94, 37.55), (129.32, 36.01), (140.0, 45.0)]:
+        indices, distances = snapshot.nearest(longitude, latitude, k=5)
+        expected = brute_force(snapshot, longitude, latitude)[:5]
+
+        assert [int(snapshot.contentid[i]) for i in indices] == [
+            contentid for _, contentid in expected
+        ]
+        assert np.allclose(distances, [distance for distance, _ in expected])
+
+
+def test_nearest_offset():
+    snapshot = get_snapshot()
+    all_indices, _ = snapshot.nearest(126.94, 37.55, k=6)
+    indices, _ = snapshot.nearest(126.94, 37.55, k=3, offset=3)
+
+    assert list(indices) == list(all_indices[3:])
+
+
+def test_nearest_max_distance():
+    snapshot = get_snapshot()
+    indices, distances = snapshot.nearest(
+        126.94, 37.55, k=100, max_distance_meter=20_000
+    )
+    expected = [
+        contentid
+        for distance, contentid in brute_force(snapshot, 126.94, 37.55)
+        if distance <= 20_000
+    ]
+
+    assert [int(snapshot.contentid[i]) for i in indices] == expected
+    assert all(distance <= 20_000 for distance in distances)
+
+
+def test_radius_is_sorted():
+    snapshot = get_snapshot()
+    _, distances = snapshot.radius(127.0, 37.5, 50_000)
+
+    assert len(distances) > 0
+    assert list(distances) == sorted(distances)
+
+
+def test_empty_snapshot():
+    snapshot = PlaceSnapshot.from_rows([])
+    indices, distances = snapshot.nearest(126.94, 37.55, k=3)
+
+    assert len(snapshot) == 0
+    assert len(indices) == 0 and len(distances) == 0
+
+
+def test_place():
+    snapshot = get_snapshot(size=10)
+    index = int(np.where(snapshot.contentid == 7)[0][0])
+    place = snapshot.place(index)
+
+    assert place.contentid == 7
+    assert place.title == "place 7"
+    assert place.firstimage2 == "http://example.com/7.jpg"
+
+
+def test_nearest_with_filter():
+    snapshot = get_snapshot()
+    place_filter = PlaceFilter(content_type_id=39, area_code=2, cat1="A01")
+    mask = snapshot.mask(place_filter)
+    indices, _ = snapshot.nearest(126.94, 37.55, k=5, mask=mask)
+    expected = [
+        contentid
+        for _, contentid in brute_force(snapshot, 126.94, 37.55)
+        if contentid % 2 == 1 and contentid % 3 == 1
+    ][:5]
+
+    assert [int(snapshot.contentid[i]) for i in indices] == expected
+    assert snapshot.mask(PlaceFilter()) is None
+    assert not snapshot.mask(PlaceFilter(cat3="missing")).any()
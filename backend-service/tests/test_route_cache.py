@@ -0,0 +1,103 @@
+from pydantic_extra_types.coordinate import Coordinate
+
+from backend_service.lru_cache import LRUCache
+from backend_service.outbound.route_cache import RouteCache, snap_to_grid
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_lru_eviction():
+    cache: LRUCache[str, int] = LRUCache(max_size=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # "b" becomes least recently used
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["hits"] == 3
+    assert cache.stats()["misses"] == 1
+
+
+def test_ttl():
+    clock = FakeClock()
+    cache: LRUCache[str, int] = LRUCache(max_size=10, ttl_second=60, clock=clock)
+    cache.put("a", 1)
+
+    clock.now += 59
+    assert cache.get("a") == 1
+    clock.now += 1
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_save_and_load(tmp_path):
+    clock = FakeClock()
+    cache: LRUCache[str, int] = LRUCache(max_size=10, ttl_second=60, clock=clock)
+    cache.put("old", 1)
+    clock.now += 30
+    cache.put("new", 2)
+    path = str(tmp_path / "cache.pickle")
+    cache.save(path)
+
+    clock.now += 40  # "old" expired while the process was down
+    restored: LRUCache[str, int] = LRUCache(max_size=10, ttl_second=60, clock=clock)
+
+    assert restored.load(path) == 1
+    assert restored.get("new") == 2
+    assert restored.get("old") is None
+
+
+def test_save_leaves_no_temp_file(tmp_path):
+    # Workers saving the same path each write their own temp file
+    path = str(tmp_path / "cache.pickle")
+    for value in range(2):
+        cache: LRUCache[str, int] = LRUCache(max_size=10)
+        cache.put("a", value)
+        cache.save(path)
+
+    assert [file.name for file in tmp_path.iterdir()] == ["cache.pickle"]
+    restored: LRUCache[str, int] = LRUCache(max_size=10)
+    assert restored.load(path) == 1
+    assert restored.get("a") == 1
+
+
+def test_snap_to_grid():
+    a = Coordinate(latitude=37.55650, longitude=126.94020)
+    b = Coordinate(latitude=37.55660, longitude=126.94030)  # ~15m away
+    c = Coordinate(latitude=37.56650, longitude=126.94020)  # ~1.1km away
+
+    assert snap_to_grid(a, 100) == snap_to_grid(b, 100)
+    assert snap_to_grid(a, 100) != snap_to_grid(c, 100)
+
+
+def test_route_cache_key_departure_bucket():
+    clock = FakeClock()
+    cache = RouteCache(
+        grid_meter=100,
+        departure_bucket_second=600,
+        ttl_second=3600,
+        max_size=10,
+        clock=clock,
+    )
+    origin = Coordinate(latitude=36.0192418, longitude=129.3242741)
+    destination = Coordinate(latitude=36.0214277, longitude=129.3370694)
+
+    clock.now = 600_000.0
+    key = cache.key(origin, destination, travel_mode="TRANSIT", profile="full")
+    cache.put(key, b"{}")
+    clock.now += 599
+    assert cache.key(origin, destination, travel_mode="TRANSIT", profile="full") == key
+    assert cache.key(origin, destination, travel_mode="WALK", profile="full") != key
+    assert (
+        cache.key(origin, destination, travel_mode="TRANSIT", profile="summary") != key
+    )
+    clock.now += 1
+    assert cache.key(origin, destination, travel_mode="TRANSIT", profile="full") != key
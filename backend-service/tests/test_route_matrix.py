@@ -0,0 +1,132 @@
+import asyncio
+from typing import Any, AsyncIterator, Sequence
+
+import orjson
+import pytest
+from pydantic_extra_types.coordinate import Coordinate
+
+from backend_service.outbound.guard import OverloadedError
+from backend_service.outbound.route_matrix import (
+    ndjson_lines,
+    split_matrix,
+    stream_route_matrix,
+)
+
+
+def coordinates(count: int) -> list[Coordinate]:
+    return [Coordinate(latitude=37.0, longitude=127.0 + i / 100) for i in range(count)]
+
+
+def test_split_matrix_covers_every_element_once():
+    for origin_count, destination_count, max_elements in [
+        (1, 1, 100),
+        (10, 10, 100),
+        (11, 10, 100),
+        (3, 250, 100),
+        (50, 50, 625),
+    ]:
+        blocks = split_matrix(origin_count, destination_count, max_elements)
+        elements = [
+            (o, d)
+            for origins, destinations in blocks
+            for o in origins
+            for d in destinations
+        ]
+
+        assert sorted(elements) == [
+            (o, d) for o in range(origin_count) for d in range(destination_count)
+        ]
+        assert all(len(o) * len(d) <= max_elements for o, d in blocks)
+
+
+def test_split_matrix_keeps_destinations_together():
+    assert split_matrix(30, 10, 100) == [
+        (range(0, 10), range(0, 10)),
+        (range(10, 20), range(0, 10)),
+        (range(20, 30), range(0, 10)),
+    ]
+
+
+async def fake_compute_chunk(
+    origins: Sequence[Coordinate], destinations: Sequence[Coordinate]
+) -> AsyncIterator[dict[str, Any]]:
+    for o in range(len(origins)):
+        for d in range(len(destinations)):
+            await asyncio.sleep(0)
+            yield {
+                "originIndex": o,
+                "destinationIndex": d,
+                # Identify the pair independently of indices
+                "distanceMeters": round(
+                    (origins[o].longitude + destinations[d].longitude) * 1000
+                ),
+            }
+
+
+def test_stream_route_matrix_translates_indices():
+    origins, destinations = coordinates(7), coordinates(5)
+
+    async def main() -> list[dict[str, Any]]:
+        return [
+            element
+            async for element in stream_route_matrix(
+                origins, destinations, max_elements=10, compute_chunk=fake_compute_chunk
+            )
+        ]
+
+    elements = asyncio.run(main())
+
+    assert len(elements) == 35
+    for element in elements:
+        origin = origins[element["originIndex"]]
+        destination = destinations[element["destinationIndex"]]
+        assert element["distanceMeters"] == round(
+            (origin.longitude + destination.longitude) * 1000
+        )
+
+
+def test_stream_route_matrix_raises_block_error():
+    async def failing_chunk(
+        origins: Sequence[Coordinate], destinations: Sequence[Coordinate]
+    ) -> AsyncIterator[dict[str, Any]]:
+        await asyncio.sleep(0)
+        raise RuntimeError("upstream failed")
+        yield {}
+
+    async def main() -> None:
+        async for _ in stream_route_matrix(
+            coordinates(3), coordinates(3), max_elements=3, compute_chunk=failing_chunk
+        ):
+            pass
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(main())
+
+
+def test_ndjson_lines_ends_failed_stream_with_error_line():
+    async def elements() -> AsyncIterator[dict[str, Any]]:
+        yield {"originIndex": 0, "destinationIndex": 0}
+        raise OverloadedError("Too many outbound calls in flight", 1.0)
+
+    async def main() -> list[bytes]:
+        return [line async for line in ndjson_lines(elements())]
+
+    lines = [orjson.loads(line) for line in asyncio.run(main())]
+
+    assert lines == [
+        {"originIndex": 0, "destinationIndex": 0},
+        {"error": "Too many outbound calls in flight"},
+    ]
+
+
+def test_ndjson_lines_complete_stream_has_no_error_line():
+    async def main() -> list[bytes]:
+        elements = stream_route_matrix(
+            coordinates(2), coordinates(2), 2, compute_chunk=fake_compute_chunk
+        )
+        return [line async for line in ndjson_lines(elements)]
+
+    lines = [orjson.loads(line) for line in asyncio.run(main())]
+
+    assert len(lines) == 4
+    assert all("error" not in line for line in lines)
@@ -0,0 +1,92 @@
+import asyncio
+
+from backend_service.outbound.single_flight import SingleFlight
+
+
+def test_concurrent_calls_share_one_call():
+    async def main() -> None:
+        single_flight: SingleFlight[int] = SingleFlight()
+        calls = 0
+        release = asyncio.Event()
+
+        async def call() -> int:
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return 42
+
+        waiters = [
+            asyncio.create_task(single_flight.do("key", call)) for _ in range(10)
+        ]
+        await asyncio.sleep(0)
+        release.set()
+
+        assert await asyncio.gather(*waiters) == [42] * 10
+        assert calls == 1
+        assert single_flight.stats() == {"in_flight": 0, "leaders": 1, "coalesced": 9}
+
+        # Finished calls are not reused
+        assert await single_flight.do("key", call) == 42
+        assert calls == 2
+
+    asyncio.run(main())
+
+
+def test_different_keys_do_not_share():
+    async def main() -> None:
+        single_flight: SingleFlight[str] = SingleFlight()
+
+        async def call(value: str) -> str:
+            await asyncio.sleep(0)
+            return value
+
+        results = await asyncio.gather(
+            single_flight.do("a", lambda: call("a")),
+            single_flight.do("b", lambda: call("b")),
+        )
+        assert results == ["a", "b"]
+        assert single_flight.stats()["coalesced"] == 0
+
+    asyncio.run(main())
+
+
+def test_cancelled_waiter_does_not_cancel_shared_call():
+    async def main() -> None:
+        single_flight: SingleFlight[int] = SingleFlight()
+        release = asyncio.Event()
+
+        async def call() -> int:
+            await release.wait()
+            return 1
+
+        leader = asyncio.create_task(single_flight.do("key", call))
+        follower = asyncio.create_task(single_flight.do("key", call))
+        await asyncio.sleep(0)
+
+        leader.cancel()
+        await asyncio.sleep(0)
+        release.set()
+
+        assert await follower == 1
+        assert leader.cancelled()
+
+    asyncio.run(main())
+
+
+def test_error_is_shared():
+    async def main() -> None:
+        single_flight: SingleFlight[int] = SingleFlight()
+
+        async def call() -> int:
+            await asyncio.sleep(0)
+            raise RuntimeError("upstream failed")
+
+        results = await asyncio.gather(
+            single_flight.do("key", call),
+            single_flight.do("key", call),
+            return_exceptions=True,
+        )
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert results[0] is results[1]
+
+    asyncio.run(main())
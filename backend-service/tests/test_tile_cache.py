@@ -0,0 +1,39 @@
+from backend_service.tile_cache import TileCache
+
+
+def test_not_cached_until_version_known():
+    cache = TileCache(max_size=10)
+    assert cache.key(10, 873, 396) is None
+
+
+def test_new_version_drops_tiles():
+    cache = TileCache(max_size=10)
+    assert cache.set_version(1)
+    key = cache.key(10, 873, 396)
+    assert key is not None
+    cache.put(key, b"tile")
+    assert cache.get(key) == b"tile"
+
+    assert not cache.set_version(1)
+    assert cache.get(key) == b"tile"
+
+    assert cache.set_version(2)
+    assert cache.get(key) is None
+    assert cache.key(10, 873, 396) != key
+    assert cache.stats()["invalidations"] == 1
+    assert cache.stats()["size"] == 0
+
+
+def test_persistence(tmp_path):
+    path = str(tmp_path / "tile_cache.pickle")
+    cache = TileCache(max_size=10)
+    cache.set_version(3)
+    key = cache.key(0, 0, 0)
+    assert key is not None
+    cache.put(key, b"tile")
+    cache.save(path)
+
+    restored = TileCache(max_size=10)
+    assert restored.load(path) == 1
+    restored.set_version(3)  # First version seen: loaded tiles are kept
+    assert restored.get(key) == b"tile"
@@ -0,0 +1,157 @@
+# Bulk load of the place table with COPY (psycopg2 sessions)
+
+import csv
+from datetime import datetime
+import io
+import itertools
+from typing import Any, Iterable, Iterator, NamedTuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from .tables import Place
+
+
+class PlaceRow(NamedTuple):
+    contentid: int
+    title: str
+    longitude: float
+    latitude: float
+    firstimage2: str
+    areacode: int
+    sigungucode: int
+    modifiedtime: datetime
+    contenttypeid: int
+    cat1: str
+    cat2: str
+    cat3: str
+
+
+# Order of the CSV fields
+COLUMNS = [
+    "contentid",
+    "title",
+    "coordinate",
+    "firstimage2",
+    "areacode",
+    "sigungucode",
+    "modifiedtime",
+    "contenttypeid",
+    "cat1",
+    "cat2",
+    "cat3",
+]
+UPSERT_TABLE = "place_upsert"
+
+
+def to_csv_fields(row: PlaceRow) -> tuple[Any, ...]:
+    return (
+        row.contentid,
+        row.title,
+        # EWKT: geography input accepts it, no ST_* call per row
+        f"SRID=4326;POINT({row.longitude!r} {row.latitude!r})",
+        row.firstimage2,
+        row.areacode,
+        row.sigungucode,
+        row.modifiedtime.isoformat(),
+        row.contenttypeid,
+        row.cat1,
+        row.cat2,
+        row.cat3,
+    )
+
+
+def csv_chunks(rows: Iterable[PlaceRow], rows_per_chunk: int = 1000) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    for chunk in itertools.batched(rows, rows_per_chunk):
+        writer.writerows(map(to_csv_fields, chunk))
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+class IteratorReader(io.TextIOBase):
+    """File-like `read(size)` over an iterator of strings (for copy_expert)
+
+    Rows are produced while COPY consumes them, so they are never all in memory.
+    """
+
+    def __init__(self, chunks: Iterator[str]):
+        self._chunks = chunks
+        self._buffer = ""
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int | None = -1) -> str:
+        if size is None or size < 0:
+            data = self._buffer + "".join(self._chunks)
+            self._buffer = ""
+            return data
+        while len(self._buffer) < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer += chunk
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+def copy_places(
+    session: Session, rows: Iterable[PlaceRow], table: str = Place.__tablename__
+) -> int:
+    """COPY rows into `table` (same columns as place) in the session's transaction
+
+    Returns the number of copied rows. The caller commits.
+    """
+    cursor = session.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {table} ({', '.join(COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+            IteratorReader(csv_chunks(rows)),
+        )
+        return cursor.rowcount
+    finally:
+        cursor.close()
+
+
+def upsert_places(session: Session, rows: Iterable[PlaceRow]) -> int:
+    """COPY rows into a temp table, then upsert them into place in one statement
+
+    Rows whose modifiedtime did not change are left untouched, unless they were
+    never filled by database_setup (contenttypeid 0, see migration 5c1f0e7d9a3b).
+    Written rows get a new updated_at. Returns the number of inserted or updated
+    rows. The caller commits (the temp table is dropped).
+    """
+    # Qualified: unqualified, search_path could resolve to a real table
+    session.execute(text(f"DROP TABLE IF EXISTS pg_temp.{UPSERT_TABLE}"))
+    session.execute(
+        text(
+            f"CREATE TEMP TABLE {UPSERT_TABLE} "
+            f"(LIKE {Place.__tablename__} INCLUDING DEFAULTS) ON COMMIT DROP"
+        )
+    )
+    copy_places(session, rows, table=UPSERT_TABLE)
+
+    columns = ", ".join(COLUMNS)
+    updates = ", ".join(
+        [
+            *(f"{c} = EXCLUDED.{c}" for c in COLUMNS if c != "contentid"),
+            "updated_at = now()",  # Inserted rows get it from the column default
+        ]
+    )
+    result = session.execute(
+        text(
+            f"""
+            INSERT INTO {Place.__tablename__} ({columns})
+            SELECT DISTINCT ON (contentid) {columns} FROM {UPSERT_TABLE}
+            ORDER BY contentid, modifiedtime DESC
+            ON CONFLICT (contentid) DO UPDATE SET {updates}
+            WHERE {Place.__tablename__}.modifiedtime
+                IS DISTINCT FROM EXCLUDED.modifiedtime
+            OR {Place.__tablename__}.contenttypeid = 0
+            """
+        )
+    )
+    return result.rowcount  # type: ignore
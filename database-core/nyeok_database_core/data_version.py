@@ -0,0 +1,26 @@
+# Version counters of tables (DataVersion), bumped by writers and polled by readers
+
+from sqlalchemy import Select, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from .tables import DataVersion, Place
+
+
+def bump(session: Session, name: str = Place.__tablename__) -> None:
+    """Increment the version of `name` in the session's transaction
+
+    Call it in the transaction that changes the table, so that readers never see
+    the new version with the old rows. The caller commits.
+    """
+    statement = insert(DataVersion).values(name=name, version=1, updated_at=func.now())
+    session.execute(
+        statement.on_conflict_do_update(
+            index_elements=[DataVersion.name],
+            set_=dict(version=DataVersion.version + 1, updated_at=func.now()),
+        )
+    )
+
+
+def current(name: str = Place.__tablename__) -> Select[tuple[int]]:
+    return select(DataVersion.version).where(DataVersion.name == name)
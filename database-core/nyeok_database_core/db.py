@@ -1,28 +1,116 @@
 # Setup database connection and expose
 
-from typing import Any, Generator
+from typing import Any, AsyncGenerator, Generator
 from sqlalchemy import Engine, create_engine
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.orm.session import Session
 
-from .with_enforcer import WithEnforcer
+from .pool_metrics import (
+    InstrumentedAsyncAdaptedQueuePool,
+    InstrumentedQueuePool,
+    PoolMetrics,
+    instrument,
+)
+from .with_enforcer import AsyncWithEnforcer, WithEnforcer
 
 
 _engine: Engine | None = None
 _SessionLocal: sessionmaker[Session] | None = None
+_pool_metrics: PoolMetrics | None = None
 
+_async_engine: AsyncEngine | None = None
+_AsyncSessionLocal: async_sessionmaker[AsyncSession] | None = None
+_async_pool_metrics: PoolMetrics | None = None
 
-def setup(username: str, password: str, hostname: str, port: int, databasename: str):
-    """User should setup database first"""
-    global _engine, _SessionLocal
+
+def setup(
+    username: str,
+    password: str,
+    hostname: str,
+    port: int,
+    databasename: str,
+    pool_size: int = 5,
+    max_overflow: int = 10,
+    pool_timeout: float = 30,
+    pool_recycle: int = -1,
+    pool_pre_ping: bool = False,
+):
+    """User should setup database first
+
+    Pool options are passed to `create_engine` (SQLAlchemy defaults by default):
+        pool_size: connections kept open in the pool
+        max_overflow: connections opened beyond pool_size under load
+        pool_timeout: seconds to wait for a connection before raising TimeoutError
+        pool_recycle: seconds after which a connection is replaced (-1: never)
+        pool_pre_ping: test connections on checkout (survives postgres restarts)
+    """
+    global _engine, _SessionLocal, _pool_metrics
 
     # NOTE: postgres trust local connections, so may not need to provide password
     _engine = create_engine(
-        f"postgresql://{username}:{password}@{hostname}:{port}/{databasename}"
+        f"postgresql://{username}:{password}@{hostname}:{port}/{databasename}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=pool_timeout,
+        pool_recycle=pool_recycle,
+        pool_pre_ping=pool_pre_ping,
     )
+    _pool_metrics = instrument(_engine)
     _SessionLocal = sessionmaker(bind=_engine)
 
 
+def setup_async(
+    username: str,
+    password: str,
+    hostname: str,
+    port: int,
+    databasename: str,
+    pool_size: int = 5,
+    max_overflow: int = 10,
+    pool_timeout: float = 30,
+    pool_recycle: int = -1,
+    pool_pre_ping: bool = False,
+):
+    """Async counterpart of `setup` (asyncpg driver)"""
+    global _async_engine, _AsyncSessionLocal, _async_pool_metrics
+
+    _async_engine = create_async_engine(
+        f"postgresql+asyncpg://{username}:{password}@{hostname}:{port}/{databasename}",
+        poolclass=InstrumentedAsyncAdaptedQueuePool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=pool_timeout,
+        pool_recycle=pool_recycle,
+        pool_pre_ping=pool_pre_ping,
+    )
+    _async_pool_metrics = instrument(_async_engine.sync_engine)
+    # Loaded objects are used after commit (e.g. serialized by FastAPI)
+    _AsyncSessionLocal = async_sessionmaker(bind=_async_engine, expire_on_commit=False)
+
+
+async def dispose_async() -> None:
+    """Close all pooled connections of the async engine (on application shutdown)"""
+    if _async_engine is not None:
+        await _async_engine.dispose()
+
+
+def get_pool_stats() -> dict[str, dict[str, Any]]:
+    """Statistics of the pools set up so far, keyed by "sync" / "async" """
+    stats: dict[str, dict[str, Any]] = {}
+    if _engine is not None and _pool_metrics is not None:
+        stats["sync"] = _pool_metrics.stats(_engine.pool)
+    if _async_engine is not None and _async_pool_metrics is not None:
+        stats["async"] = _async_pool_metrics.stats(_async_engine.sync_engine.pool)
+    return stats
+
+
 def get_session_yield() -> Generator[Session, Any, None]:
     """Used by FastAPI dependency"""
     if _SessionLocal is None:
@@ -42,3 +130,24 @@ def get_session_with() -> Session:
 
     session: Session = _SessionLocal()
     return WithEnforcer(session)  # type: ignore[return-type]
+
+
+async def get_async_session_yield() -> AsyncGenerator[AsyncSession, None]:
+    """Used by FastAPI dependency (async)"""
+    if _AsyncSessionLocal is None:
+        raise Exception("Async database has not been initialized")
+
+    session: AsyncSession = _AsyncSessionLocal()
+    try:
+        yield session
+    finally:
+        await session.close()
+
+
+def get_async_session_with() -> AsyncSession:
+    """Used by non-FastAPI user, within `async with` block"""
+    if _AsyncSessionLocal is None:
+        raise Exception("Async database has not been initialized")
+
+    session: AsyncSession = _AsyncSessionLocal()
+    return AsyncWithEnforcer(session)  # type: ignore[return-type]
@@ -0,0 +1,124 @@
+"""Connection pool statistics
+
+* checked out / overflow: read from the pool itself
+* checkout wait time histogram: measured around `QueuePool._do_get`
+  (includes establishing a new connection when the pool is not full yet)
+* connection creation rate: counted by the pool "connect" event
+  (new connections, reconnects after recycle / invalidation)
+"""
+
+import bisect
+import threading
+import time
+from collections import deque
+from typing import Any
+
+from sqlalchemy import Engine, event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry, Pool, QueuePool
+
+# Upper bounds of checkout wait time buckets (seconds)
+WAIT_BUCKETS_SECOND: tuple[float, ...] = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30)
+
+
+class PoolMetrics:
+    """Counters shared by a pool and the pools recreated from it (thread-safe)"""
+
+    def __init__(self, rate_window_second: float = 60.0):
+        self.rate_window_second = rate_window_second
+        self._lock = threading.Lock()
+        self._wait_buckets: list[int] = [0] * (len(WAIT_BUCKETS_SECOND) + 1)
+        self._wait_count = 0
+        self._wait_sum_second = 0.0
+        self._timeouts = 0
+        self._connections_created = 0
+        self._connected_at: deque[float] = deque()
+
+    def observe_wait(self, seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            self._wait_buckets[bisect.bisect_left(WAIT_BUCKETS_SECOND, seconds)] += 1
+            self._wait_count += 1
+            self._wait_sum_second += seconds
+            if timed_out:
+                self._timeouts += 1
+
+    def observe_connect(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._connections_created += 1
+            self._connected_at.append(now)
+            self._expire_connected_at(now)
+
+    def _expire_connected_at(self, now: float) -> None:
+        while self._connected_at and (
+            now - self._connected_at[0] > self.rate_window_second
+        ):
+            self._connected_at.popleft()
+
+    def stats(self, pool: Pool) -> dict[str, Any]:
+        with self._lock:
+            self._expire_connected_at(time.monotonic())
+            histogram: dict[str, int] = {}
+            cumulative = 0  # Prometheus style: count of waits <= bound
+            for bound, count in zip(
+                [*map(str, WAIT_BUCKETS_SECOND), "+Inf"], self._wait_buckets
+            ):
+                cumulative += count
+                histogram[bound] = cumulative
+
+            result: dict[str, Any] = {
+                "checkout_wait_second_histogram": histogram,
+                "checkout_wait_count": self._wait_count,
+                "checkout_wait_second_sum": self._wait_sum_second,
+                "checkout_timeouts": self._timeouts,
+                "connections_created": self._connections_created,
+                "connections_created_per_second": len(self._connected_at)
+                / self.rate_window_second,
+            }
+
+        if isinstance(pool, QueuePool):
+            result.update(
+                size=pool.size(),
+                checked_in=pool.checkedin(),
+                checked_out=pool.checkedout(),
+                overflow=pool.overflow(),
+            )
+        return result
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool which records checkout wait time into `metrics`"""
+
+    metrics: PoolMetrics
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        start = time.perf_counter()
+        try:
+            entry = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.observe_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        self.metrics.observe_wait(time.perf_counter() - start)
+        return entry
+
+    def recreate(self) -> QueuePool:
+        # Engine.dispose() replaces the pool: keep the same counters
+        pool = super().recreate()
+        pool.metrics = self.metrics  # type: ignore[attr-defined]
+        return pool
+
+
+class InstrumentedAsyncAdaptedQueuePool(InstrumentedQueuePool, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool which records checkout wait time into `metrics`"""
+
+
+def instrument(engine: Engine) -> PoolMetrics:
+    """Attach PoolMetrics to an engine created with an Instrumented*Pool poolclass"""
+    metrics = PoolMetrics()
+    engine.pool.metrics = metrics  # type: ignore[attr-defined]
+
+    @event.listens_for(engine, "connect")
+    def on_connect(*_: Any) -> None:
+        metrics.observe_connect()
+
+    return metrics
@@ -1,6 +1,12 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, Index, func, text
 from sqlalchemy.orm import Mapped, mapped_column, DeclarativeBase
 from geoalchemy2 import Geography
 
+# TourAPI contentTypeId (database_setup.tourapi.ContentTypeId)
+CONTENT_TYPE_IDS = [12, 14, 15, 25, 28, 32, 38, 39]
+
 
 class TableBase(DeclarativeBase):
     pass
@@ -12,3 +18,58 @@ class Place(TableBase):
     title: Mapped[str]
     coordinate: Mapped[Geography] = mapped_column(Geography("POINT", srid=4326))
     firstimage2: Mapped[str]  # 썸네일 이미지
+    areacode: Mapped[int] = mapped_column(index=True)  # 지역코드
+    sigungucode: Mapped[int]  # 시군구코드
+    modifiedtime: Mapped[datetime]  # 수정일 (TourAPI, KST)
+    contenttypeid: Mapped[int] = mapped_column(index=True)  # 관광타입
+    cat1: Mapped[str] = mapped_column(index=True)  # 대분류 (e.g. A01)
+    cat2: Mapped[str] = mapped_column(index=True)  # 중분류 (e.g. A0101)
+    cat3: Mapped[str] = mapped_column(index=True)  # 소분류 (e.g. A01010100)
+    # Last write of the row (insert or upsert), unlike modifiedtime of TourAPI
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), index=True
+    )
+
+    # Nearest places of one content type walk a small index of that type only.
+    # Postgres uses a partial index when contenttypeid is compared to a literal
+    __table_args__ = (
+        *(
+            Index(
+                f"ix_place_coordinate_contenttypeid_{contenttypeid}",
+                "coordinate",
+                postgresql_using="gist",
+                postgresql_where=f"contenttypeid = {contenttypeid}",
+            )
+            for contenttypeid in CONTENT_TYPE_IDS
+        ),
+        # Longitude/latitude boxes (map viewports, tiles) are matched on geometry:
+        # edges of a geography box are great circles, not parallels
+        Index(
+            "ix_place_coordinate_geometry",
+            text("CAST(coordinate AS geometry(POINT,4326))"),
+            postgresql_using="gist",
+        ),
+    )
+
+
+class SyncState(TableBase):
+    """Progress of incremental sync, per area (sigungucode 0: whole area)"""
+
+    __tablename__ = "sync_state"
+    areacode: Mapped[int] = mapped_column(primary_key=True)
+    sigungucode: Mapped[int] = mapped_column(primary_key=True)
+    high_water_mark: Mapped[datetime]  # Largest modifiedtime synced
+    last_reconciled_at: Mapped[datetime | None]  # Last deletion of vanished rows
+
+
+class DataVersion(TableBase):
+    """Incremented whenever the rows of a table change (see data_version.bump)
+
+    Readers compare it to invalidate what they derived from the table, e.g. the
+    map tiles cached by the backend.
+    """
+
+    __tablename__ = "data_version"
+    name: Mapped[str] = mapped_column(primary_key=True)  # Table name
+    version: Mapped[int]
+    updated_at: Mapped[datetime]
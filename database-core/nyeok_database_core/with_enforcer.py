@@ -1,5 +1,5 @@
 from types import TracebackType
-from typing import Any, ContextManager, Generic, TypeVar
+from typing import Any, AsyncContextManager, ContextManager, Generic, TypeVar
 
 
 T = TypeVar("T", bound=ContextManager[Any])
@@ -62,3 +62,37 @@ class WithEnforcer(Generic[T]):
         else:
             self._assert_within()
             return getattr(object.__getattribute__(self, "_item"), name)
+
+
+A = TypeVar("A", bound=AsyncContextManager[Any])
+
+
+class AsyncWithEnforcer(WithEnforcer[Any], Generic[A]):
+    """`WithEnforcer` for async context managers, used within an 'async with' block.
+
+    Example:
+        >>> cm: CM = AsyncWithEnforcer(some_async_context_manager) # type: ignore
+        >>> async with cm:
+        >>>     await cm.some_method()
+        >>> await cm.some_method()    # RuntimeError
+    """
+
+    _item: A
+
+    def __init__(self, item: A):
+        self._item = item
+        self._is_within = False
+
+    async def __aenter__(self):
+        self._is_within = True
+        await self._item.__aenter__()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ):
+        await self._item.__aexit__(exc_type, exc_value, traceback)
+        self._is_within = False
@@ -0,0 +1,118 @@
+import csv
+from datetime import datetime
+import io
+from types import SimpleNamespace
+from typing import Any
+
+from nyeok_database_core.bulk import (
+    IteratorReader,
+    PlaceRow,
+    csv_chunks,
+    upsert_places,
+)
+
+
+def row(contentid: int, title: str) -> PlaceRow:
+    return PlaceRow(
+        contentid=contentid,
+        title=title,
+        longitude=126.9402326,
+        latitude=37.5565616,
+        firstimage2="http://tong.visitkorea.or.kr/image.jpg",
+        areacode=1,
+        sigungucode=13,
+        modifiedtime=datetime(2024, 9, 20, 15, 30, 12),
+        contenttypeid=39,
+        cat1="A05",
+        cat2="A0502",
+        cat3="A05020900",
+    )
+
+
+def test_csv_fields_are_escaped():
+    rows = [row(1, 'Cafe "Nyeok", Mapo'), row(2, "two\nlines")]
+    data = "".join(csv_chunks(rows))
+
+    parsed = list(csv.reader(io.StringIO(data)))
+    assert parsed[0] == [
+        "1",
+        'Cafe "Nyeok", Mapo',
+        "SRID=4326;POINT(126.9402326 37.5565616)",
+        "http://tong.visitkorea.or.kr/image.jpg",
+        "1",
+        "13",
+        "2024-09-20T15:30:12",
+        "39",
+        "A05",
+        "A0502",
+        "A05020900",
+    ]
+    assert parsed[1][1] == "two\nlines"
+
+
+def test_iterator_reader_is_lazy():
+    produced: list[int] = []
+
+    def rows():
+        for contentid in range(10_000):
+            produced.append(contentid)
+            yield row(contentid, f"place {contentid}")
+
+    reader = IteratorReader(csv_chunks(rows(), rows_per_chunk=100))
+    first = reader.read(8192)
+
+    assert len(first) == 8192
+    assert len(produced) < 1000  # Only what COPY asked for so far
+
+    rest = reader.read(-1)
+    lines = (first + rest).splitlines()
+    assert len(lines) == 10_000
+    assert lines[-1].startswith("9999,")
+    assert reader.read(8192) == ""
+
+
+class FakeCursor:
+    def __init__(self, copied: list[str]):
+        self.copied = copied
+        self.rowcount = -1
+
+    def copy_expert(self, sql: str, file: io.TextIOBase) -> None:
+        self.copied.extend(file.read().splitlines())
+        self.rowcount = len(self.copied)
+
+    def close(self) -> None:
+        pass
+
+
+class FakeSession:
+    """Records the SQL of every statement, and the rows given to COPY"""
+
+    def __init__(self) -> None:
+        self.statements: list[str] = []
+        self.copied: list[str] = []
+
+    def execute(self, statement: Any) -> Any:
+        self.statements.append(" ".join(str(statement).split()))
+        return SimpleNamespace(rowcount=len(self.copied))
+
+    def connection(self) -> Any:
+        cursor = FakeCursor(self.copied)
+        return SimpleNamespace(connection=SimpleNamespace(cursor=lambda: cursor))
+
+
+def test_upsert_places_statements():
+    session: Any = FakeSession()
+
+    assert upsert_places(session, [row(1, "one"), row(2, "two")]) == 2
+
+    drop, create, upsert = session.statements
+    # Never a table of the same name found first through search_path
+    assert drop == "DROP TABLE IF EXISTS pg_temp.place_upsert"
+    assert create.startswith("CREATE TEMP TABLE place_upsert")
+    assert len(session.copied) == 2
+    assert "ON CONFLICT (contentid) DO UPDATE SET" in upsert
+    assert "cat3 = EXCLUDED.cat3, updated_at = now() WHERE" in upsert
+    assert upsert.endswith(
+        "WHERE place.modifiedtime IS DISTINCT FROM EXCLUDED.modifiedtime"
+        " OR place.contenttypeid = 0"
+    )
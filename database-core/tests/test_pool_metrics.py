@@ -0,0 +1,63 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from nyeok_database_core.pool_metrics import InstrumentedQueuePool, instrument
+
+
+def get_engine(tmp_path):
+    return create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+
+
+def test_checkout_and_connect_counts(tmp_path):
+    engine = get_engine(tmp_path)
+    metrics = instrument(engine)
+
+    with engine.connect():
+        stats = metrics.stats(engine.pool)
+        assert stats["checked_out"] == 1
+        assert stats["connections_created"] == 1
+
+    with engine.connect():
+        pass  # Reuses the pooled connection
+
+    stats = metrics.stats(engine.pool)
+    assert stats["checked_out"] == 0
+    assert stats["checkout_wait_count"] == 2
+    assert stats["connections_created"] == 1
+    assert stats["checkout_wait_second_histogram"]["+Inf"] == 2
+
+
+def test_timeout_is_counted(tmp_path):
+    engine = get_engine(tmp_path)
+    metrics = instrument(engine)
+
+    with engine.connect():
+        with pytest.raises(PoolTimeoutError):
+            engine.connect()
+
+    stats = metrics.stats(engine.pool)
+    assert stats["checkout_timeouts"] == 1
+    assert stats["checkout_wait_second_histogram"]["+Inf"] == 2
+    assert stats["checkout_wait_second_sum"] >= 0.05
+
+
+def test_metrics_survive_dispose(tmp_path):
+    engine = get_engine(tmp_path)
+    metrics = instrument(engine)
+
+    with engine.connect():
+        pass
+    engine.dispose()
+    with engine.connect():
+        pass
+
+    stats = metrics.stats(engine.pool)
+    assert stats["checkout_wait_count"] == 2
+    assert stats["connections_created"] == 2
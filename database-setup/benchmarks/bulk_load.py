@@ -0,0 +1,130 @@
+"""Throughput of loading the place table: ORM add_all vs COPY (nyeok_database_core.bulk)
+
+Rows are loaded into a TEMP TABLE named `place`, which shadows `public.place`
+for the benchmark session only. Nothing is written to the real table.
+
+Usage (from database-setup/):
+    python -m benchmarks.bulk_load --sizes 10000 100000 1000000
+"""
+
+import argparse
+from datetime import datetime, timedelta
+import itertools
+import random
+import time
+from typing import Callable, Iterator
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from nyeok_database_core import bulk, db
+from nyeok_database_core.bulk import PlaceRow
+from nyeok_database_core.tables import Place
+
+# Bounding box of South Korea
+MIN_LON, MAX_LON = 124.6, 131.9
+MIN_LAT, MAX_LAT = 33.1, 38.6
+IMAGE = "http://tong.visitkorea.or.kr/cms/resource/00/0000000_image3_1.jpg"
+
+
+def generate_rows(size: int, modifiedtime: datetime) -> Iterator[PlaceRow]:
+    for contentid in range(size):
+        yield PlaceRow(
+            contentid=contentid,
+            title=f"place {contentid}",
+            longitude=random.uniform(MIN_LON, MAX_LON),
+            latitude=random.uniform(MIN_LAT, MAX_LAT),
+            firstimage2=IMAGE,
+            areacode=1,
+            sigungucode=13,
+            modifiedtime=modifiedtime,
+            contenttypeid=12,
+            cat1="A01",
+            cat2="A0101",
+            cat3="A01010100",
+        )
+
+
+def load_orm(session: Session, rows: Iterator[PlaceRow]) -> None:
+    """What database_setup.pipeline.insert_places does"""
+    for batch in itertools.batched(rows, 1000):
+        session.add_all(
+            Place(
+                contentid=row.contentid,
+                title=row.title,
+                coordinate=f"POINT({row.longitude} {row.latitude})",
+                firstimage2=row.firstimage2,
+                areacode=row.areacode,
+                sigungucode=row.sigungucode,
+                modifiedtime=row.modifiedtime,
+                contenttypeid=row.contenttypeid,
+                cat1=row.cat1,
+                cat2=row.cat2,
+                cat3=row.cat3,
+            )
+            for row in batch
+        )
+        session.flush()
+        session.expunge_all()
+
+
+def load_copy(session: Session, rows: Iterator[PlaceRow]) -> None:
+    bulk.copy_places(session, rows)
+
+
+def measure(
+    size: int,
+    load: Callable[[Session, Iterator[PlaceRow]], object],
+    upsert_after_load: bool = False,
+) -> float:
+    """Seconds to load `size` rows (with upsert_after_load: to upsert them again)"""
+    modifiedtime = datetime(2024, 9, 1)
+    with db.get_session_with() as session:
+        session.execute(
+            text("CREATE TEMP TABLE place (LIKE public.place INCLUDING ALL)")
+        )
+        if upsert_after_load:
+            bulk.copy_places(session, generate_rows(size, modifiedtime))
+            modifiedtime += timedelta(days=1)  # Every row changed
+
+        start = time.perf_counter()
+        load(session, generate_rows(size, modifiedtime))
+        elapsed = time.perf_counter() - start
+
+        session.rollback()  # Drops the temp table
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=5432)
+    parser.add_argument("--user", default="superuser")
+    parser.add_argument("--password", default="password")
+    parser.add_argument("--database", default="database")
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+    )
+    args = parser.parse_args()
+
+    db.setup(
+        username=args.user,
+        password=args.password,
+        hostname=args.host,
+        port=args.port,
+        databasename=args.database,
+    )
+
+    print(f"{'rows':>10} {'method':<12} {'seconds':>10} {'rows/s':>12}")
+    for size in args.sizes:
+        for name, load, upsert_after_load in [
+            ("orm add_all", load_orm, False),
+            ("copy", load_copy, False),
+            ("copy upsert", bulk.upsert_places, True),
+        ]:
+            elapsed = measure(size, load, upsert_after_load)
+            print(f"{size:>10} {name:<12} {elapsed:>10.2f} {size / elapsed:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
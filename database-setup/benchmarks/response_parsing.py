@@ -0,0 +1,99 @@
+"""Parse time of a TourAPI page per 10k items: BaseAPI.get before and after
+
+before: decode to str, from_json, then ResponseRoot[itemT].model_validate
+after:  BaseAPI.rootT.model_validate_json on the response bytes
+
+No network: pages are generated with the shape of areaBasedList1 responses.
+
+Usage (from database-setup/):
+    python -m benchmarks.response_parsing --items 1000 10000 --repeat 5
+"""
+
+import argparse
+import json
+import os
+import time
+from typing import Callable
+
+from pydantic_core import from_json
+
+# database_setup.env requires it at import time
+os.environ.setdefault("DATAKR_API_KEY", "benchmark")
+
+from database_setup.tourapi import AreaBasedListAPI  # noqa: E402
+from database_setup.tourapi.types import ResponseRoot  # noqa: E402
+
+
+def generate_page(size: int) -> bytes:
+    items = [
+        dict(
+            addr1="서울특별시 마포구 와우산로 94",
+            addr2="",
+            areacode=1,
+            booktour="",
+            cat1="A02",
+            cat2="A0203",
+            cat3="A02030600",
+            contentid=contentid,
+            contenttypeid=12,
+            createdtime=20071106000000,
+            firstimage=f"http://tong.visitkorea.or.kr/{contentid}_image2_1.jpg",
+            firstimage2=f"http://tong.visitkorea.or.kr/{contentid}_image3_1.jpg",
+            cpyrhtDivCd="Type3",
+            mapx=126.92 + contentid * 1e-6,
+            mapy=37.55 + contentid * 1e-6,
+            mlevel="6",
+            modifiedtime=20240101000000,
+            sigungucode=13,
+            tel="",
+            title=f"관광지 {contentid}",
+            zipcode="04066",
+        )
+        for contentid in range(size)
+    ]
+    root = dict(
+        response=dict(
+            header=dict(resultCode="0000", resultMsg="OK"),
+            body=dict(
+                items=dict(item=items), numOfRows=size, pageNo=1, totalCount=size
+            ),
+        )
+    )
+    return json.dumps(root, ensure_ascii=False).encode()
+
+
+def parse_before(content: bytes) -> None:
+    text = content.decode()
+    ResponseRoot[AreaBasedListAPI.Item].model_validate(from_json(text))
+
+
+def parse_after(content: bytes) -> None:
+    AreaBasedListAPI.AreaBasedListAPI.rootT.model_validate_json(content)
+
+
+def measure(parse: Callable[[bytes], None], content: bytes, repeat: int) -> float:
+    """Best of `repeat`, in seconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parse(content)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for size in args.items:
+        content = generate_page(size)
+        print(f"{size} items ({len(content) / 1e6:.1f} MB)")
+        for name, parse in [("before", parse_before), ("after", parse_after)]:
+            second = measure(parse, content, args.repeat)
+            print(f"  {name:<6} {second * 1000 * 10000 / size:8.1f} ms / 10k items")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Place table: Add sync columns, sync_state table
+
+Revision ID: 2ba3abe1e672
+Revises: 8d16c0508c08
+Create Date: 2024-09-20 15:12:08.417362
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "2ba3abe1e672"
+down_revision: Union[str, None] = "8d16c0508c08"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "sync_state",
+        sa.Column("areacode", sa.Integer(), nullable=False),
+        sa.Column("sigungucode", sa.Integer(), nullable=False),
+        sa.Column("high_water_mark", sa.DateTime(), nullable=False),
+        sa.Column("last_reconciled_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("areacode", "sigungucode"),
+    )
+    # server_default fills existing rows, then it is dropped (set by database_setup)
+    op.add_column(
+        "place",
+        sa.Column("areacode", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.add_column(
+        "place",
+        sa.Column("sigungucode", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.add_column(
+        "place",
+        sa.Column(
+            "modifiedtime",
+            sa.DateTime(),
+            nullable=False,
+            server_default=sa.text("'epoch'::timestamp"),
+        ),
+    )
+    for column in ["areacode", "sigungucode", "modifiedtime"]:
+        op.alter_column("place", column, server_default=None)
+    op.create_index(op.f("ix_place_areacode"), "place", ["areacode"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_place_areacode"), table_name="place")
+    op.drop_column("place", "modifiedtime")
+    op.drop_column("place", "sigungucode")
+    op.drop_column("place", "areacode")
+    op.drop_table("sync_state")
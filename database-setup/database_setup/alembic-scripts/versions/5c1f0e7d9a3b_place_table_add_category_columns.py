@@ -0,0 +1,64 @@
+"""Place table: Add contenttypeid, cat1-3 columns and their indexes
+
+Revision ID: 5c1f0e7d9a3b
+Revises: 2ba3abe1e672
+Create Date: 2024-09-23 10:41:27.530118
+
+Existing rows get contenttypeid 0 and empty categories, so they don't match
+the /places_closest filters until they are loaded again. A full reload fixes
+every row at once. Otherwise bulk.upsert_places rewrites such rows even when
+unchanged, and incremental sync lists the whole area while it has any.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "5c1f0e7d9a3b"
+down_revision: Union[str, None] = "2ba3abe1e672"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Same as nyeok_database_core.tables.CONTENT_TYPE_IDS when this was written
+CONTENT_TYPE_IDS = [12, 14, 15, 25, 28, 32, 38, 39]
+
+
+def upgrade() -> None:
+    # server_default fills existing rows, then it is dropped (set by database_setup)
+    # 0 marks rows to fill again (see the module docstring)
+    op.add_column(
+        "place",
+        sa.Column("contenttypeid", sa.Integer(), nullable=False, server_default="0"),
+    )
+    for column in ["cat1", "cat2", "cat3"]:
+        op.add_column(
+            "place",
+            sa.Column(column, sa.String(), nullable=False, server_default=""),
+        )
+    for column in ["contenttypeid", "cat1", "cat2", "cat3"]:
+        op.alter_column("place", column, server_default=None)
+        op.create_index(op.f(f"ix_place_{column}"), "place", [column], unique=False)
+
+    for contenttypeid in CONTENT_TYPE_IDS:
+        op.create_index(
+            f"ix_place_coordinate_contenttypeid_{contenttypeid}",
+            "place",
+            ["coordinate"],
+            unique=False,
+            postgresql_using="gist",
+            postgresql_where=sa.text(f"contenttypeid = {contenttypeid}"),
+        )
+
+
+def downgrade() -> None:
+    for contenttypeid in CONTENT_TYPE_IDS:
+        op.drop_index(
+            f"ix_place_coordinate_contenttypeid_{contenttypeid}",
+            table_name="place",
+            postgresql_using="gist",
+        )
+    for column in ["cat3", "cat2", "cat1", "contenttypeid"]:
+        op.drop_index(op.f(f"ix_place_{column}"), table_name="place")
+        op.drop_column("place", column)
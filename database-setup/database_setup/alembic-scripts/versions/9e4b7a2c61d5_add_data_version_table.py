@@ -0,0 +1,38 @@
+"""Add data_version table
+
+Revision ID: 9e4b7a2c61d5
+Revises: 5c1f0e7d9a3b
+Create Date: 2024-09-24 14:02:51.118406
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "9e4b7a2c61d5"
+down_revision: Union[str, None] = "5c1f0e7d9a3b"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "data_version",
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("name"),
+    )
+    # Tiles are cached only once the place table has a version: start at 1, not
+    # at the next run of database_setup that changes places
+    op.execute(
+        "INSERT INTO data_version (name, version, updated_at) "
+        "VALUES ('place', 1, now())"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("data_version")
@@ -0,0 +1,35 @@
+"""Place table: Add GiST index on coordinate as geometry
+
+Revision ID: c3e8f1a4b702
+Revises: 9e4b7a2c61d5
+Create Date: 2024-09-25 10:12:40.204871
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "c3e8f1a4b702"
+down_revision: Union[str, None] = "9e4b7a2c61d5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Longitude/latitude boxes are matched on geometry (see backend place_queries)
+    op.create_index(
+        "ix_place_coordinate_geometry",
+        "place",
+        [sa.text("CAST(coordinate AS geometry(POINT,4326))")],
+        unique=False,
+        postgresql_using="gist",
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_place_coordinate_geometry", table_name="place", postgresql_using="gist"
+    )
@@ -0,0 +1,39 @@
+"""Place table: Add updated_at column
+
+Revision ID: e5a1d9c7b3f2
+Revises: c3e8f1a4b702
+Create Date: 2024-09-25 16:48:03.571925
+
+Existing rows get the time of the migration, so the next delta export after it
+sends every place once.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "e5a1d9c7b3f2"
+down_revision: Union[str, None] = "c3e8f1a4b702"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The default stays: COPY and ORM inserts of database_setup don't set it
+    op.add_column(
+        "place",
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.text("now()"),
+        ),
+    )
+    op.create_index(op.f("ix_place_updated_at"), "place", ["updated_at"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_place_updated_at"), table_name="place")
+    op.drop_column("place", "updated_at")
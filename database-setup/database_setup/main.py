@@ -1,28 +1,17 @@
+import argparse
+
 from nyeok_database_core import db
-from nyeok_database_core.tables import Place
 
+from .nationwide import load_nationwide
+from .pipeline import parallel_place_rows, place_rows
+from .swap import place_load_lock, reload_places
+from .sync import sync_area
 from .tourapi import AreaBasedListAPI
 from .tourapi.AreaCode import AreaCode
+from .tourapi.response_cache import ResponseCache
 
 
-def api_to_db_place(place: AreaBasedListAPI.Item) -> Place:
-    return Place(
-        contentid=place.contentid,
-        title=place.title,
-        coordinate=f"POINT({place.mapx} {place.mapy})",  # Well-Known Text
-        firstimage2=place.firstimage2,
-    )
-
-
-if __name__ == "__main__":
-    db.setup(
-        username="superuser",
-        password="wrongpassword",
-        hostname="localhost",
-        port=5432,
-        databasename="database",
-    )
-
+def run_full(parse_workers: int) -> None:
     # Fetch data from API
     params = AreaBasedListAPI.Params(
         numOfRows=10,
@@ -36,16 +25,123 @@ if __name__ == "__main__":
         cat2=None,
         cat3=None,
     )
-    placeList: list[AreaBasedListAPI.Item] = (
-        AreaBasedListAPI.AreaBasedListAPI.get_items_all(params)
+    if parse_workers > 1:
+        # Threads only fetch; pages are validated by other processes
+        pages = AreaBasedListAPI.AreaBasedListAPI.iter_raw_pages(
+            params, num_of_rows=1000, max_workers=4
+        )
+        rows = parallel_place_rows(pages, workers=parse_workers)
+    else:
+        # At most max_workers pages of num_of_rows items are held at once
+        placeIter = AreaBasedListAPI.AreaBasedListAPI.iter_items(
+            params, num_of_rows=1000, max_workers=4
+        )
+        rows = place_rows(placeIter)
+
+    # Load a staging table (streamed: pages are fetched while COPY consumes rows),
+    # then swap it with place
+    inserted = reload_places(rows)
+    print(f"Only places with image: {inserted=}")
+
+
+def run_incremental(reconcile: bool) -> None:
+    # Not while a full reload builds the next table (its upserts would be lost)
+    with place_load_lock(), db.get_session_with() as session:
+        result = sync_area(
+            session,
+            areacode=int(AreaCode.서울),
+            sigungucode=AreaCode.서울.마포구,
+            force_reconcile=reconcile,
+        )
+        print(f"Incremental sync: {result}")
+
+
+def run_nationwide(checkpoint_path: str, workers: int, fresh: bool) -> None:
+    # Upserts into the live table, like incremental
+    with place_load_lock():
+        result = load_nationwide(checkpoint_path, max_workers=workers, fresh=fresh)
+    print(
+        f"Nationwide: {result.done} shards loaded, {result.skipped} already done, "
+        f"{len(result.failed)} failed"
+    )
+    if result.failed:
+        raise SystemExit(f"Run again to retry the failed shards ({checkpoint_path})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load TourAPI places to database")
+    parser.add_argument(
+        "--mode",
+        choices=["full", "incremental", "nationwide"],
+        default="full",
+        help="full: load a new table and swap it in / incremental: upsert places "
+        "modified since the last sync / nationwide: upsert every area/sigungu",
+    )
+    parser.add_argument(
+        "--reconcile",
+        action="store_true",
+        help="incremental: also delete places removed from TourAPI (otherwise weekly)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=4,
+        help="nationwide: number of area/sigungu shards loaded at once",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        default="nationwide_checkpoint.json",
+        help="nationwide: completed shards of an unfinished run, skipped when run "
+        "again (removed once every shard is done)",
+    )
+    parser.add_argument(
+        "--fresh",
+        action="store_true",
+        help="nationwide: ignore the checkpoint and load every shard",
+    )
+    parser.add_argument(
+        "--parse-workers",
+        type=int,
+        default=0,
+        help="full: validate pages in this many processes (0: in the main process)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help="Cache TourAPI responses in this directory (e.g. .tourapi_cache)",
+    )
+    parser.add_argument(
+        "--cache-ttl-hours",
+        type=float,
+        default=24,
+        help="--cache-dir: responses older than this are fetched again",
+    )
+    parser.add_argument(
+        "--replay",
+        action="store_true",
+        help="--cache-dir: never use the network, fail on responses not cached",
+    )
+    args = parser.parse_args()
+
+    if args.cache_dir is not None:
+        AreaBasedListAPI.AreaBasedListAPI.cache = ResponseCache(
+            args.cache_dir,
+            ttl_second=args.cache_ttl_hours * 60 * 60,
+            replay_only=args.replay,
+        )
+    elif args.replay:
+        parser.error("--replay requires --cache-dir")
+
+    db.setup(
+        username="superuser",
+        password="wrongpassword",
+        hostname="localhost",
+        port=5432,
+        databasename="database",
     )
 
-    dbPlaceList: list[Place] = list(map(api_to_db_place, placeList))
-    print(f"All places: {len(dbPlaceList)=}")
-    dbPlaceList = list(filter(lambda place: place.firstimage2 != "", dbPlaceList))
-    print(f"Only places with image: {len(dbPlaceList)=}")
-    # Insert to DB
-    with db.get_session_with() as session:
-        session.query(Place).delete()  # Delete all rows
-        session.add_all(dbPlaceList)
-        session.commit()
+    if args.mode == "incremental":
+        run_incremental(args.reconcile)
+    elif args.mode == "nationwide":
+        run_nationwide(args.checkpoint, args.workers, args.fresh)
+    else:
+        run_full(args.parse_workers)
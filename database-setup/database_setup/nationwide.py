@@ -0,0 +1,209 @@
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from datetime import datetime
+import json
+import os
+import threading
+from typing import Any, Callable, Iterable, Iterator, NamedTuple
+
+from nyeok_database_core import bulk, data_version, db
+
+from .pipeline import place_rows
+from .sync import unassigned_places
+from .tourapi import AreaBasedListAPI
+from .tourapi.AreaCode import AreaCode
+
+
+class Shard(NamedTuple):
+    """One area/sigungu pair, loaded independently of the others"""
+
+    areacode: int
+    sigungucode: int
+    name: str  # e.g. "서울 마포구"
+
+    @property
+    def key(self) -> str:
+        return f"{self.areacode}-{self.sigungucode}"
+
+
+def all_shards() -> list[Shard]:
+    """Every area/sigungu pair of AreaCode, in definition order"""
+    shards: list[Shard] = []
+    for area_name, area in vars(AreaCode).items():
+        if not isinstance(area, type):
+            continue
+        # class_with_int wraps the nested class (e.g. 서울Code) that has the codes
+        for sigungu_name, sigungucode in vars(area.__base__).items():
+            if isinstance(sigungucode, int):
+                shards.append(
+                    Shard(int(area), sigungucode, f"{area_name} {sigungu_name}")
+                )
+    return shards
+
+
+class Checkpoint:
+    """Progress per shard in a JSON file, rewritten after every shard"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._shards: dict[str, dict[str, Any]] = {}
+        if os.path.isfile(path):
+            with open(path, encoding="utf-8") as file:
+                self._shards = json.load(file)
+
+    def is_done(self, shard: Shard) -> bool:
+        return self._shards.get(shard.key, {}).get("status") == "done"
+
+    def mark_done(self, shard: Shard, rows: int) -> None:
+        self._update(shard, dict(status="done", rows=rows))
+
+    def mark_failed(self, shard: Shard, error: BaseException) -> None:
+        self._update(shard, dict(status="failed", error=repr(error)))
+
+    def clear(self) -> None:
+        """Forget every shard and remove the file: the next run starts over"""
+        with self._lock:
+            self._shards = {}
+            if os.path.isfile(self.path):
+                os.remove(self.path)
+
+    def _update(self, shard: Shard, entry: dict[str, Any]) -> None:
+        entry.update(name=shard.name, updated_at=datetime.now().isoformat())
+        with self._lock:
+            self._shards[shard.key] = entry
+            # Atomic: an interrupted write never corrupts the checkpoint
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as file:
+                json.dump(self._shards, file, ensure_ascii=False, indent=2)
+            os.replace(temp_path, self.path)
+
+
+class ContentIdFilter:
+    """Skips places already loaded by another shard (thread-safe)
+
+    A contentid counts as loaded once its shard committed, so a failed shard
+    doesn't hide its places from the others.
+    """
+
+    def __init__(self) -> None:
+        self._loaded: set[int] = set()
+        self._lock = threading.Lock()
+
+    def unseen(
+        self, rows: Iterable[bulk.PlaceRow], contentids: set[int]
+    ) -> Iterator[bulk.PlaceRow]:
+        """Rows not loaded yet; their contentids are collected in `contentids`"""
+        for row in rows:
+            with self._lock:
+                if row.contentid in self._loaded:
+                    continue
+            contentids.add(row.contentid)
+            yield row
+
+    def mark_loaded(self, contentids: set[int]) -> None:
+        with self._lock:
+            self._loaded |= contentids
+
+
+class ShardResult(NamedTuple):
+    done: int
+    skipped: int  # done by a previous run
+    failed: list[Shard]
+
+
+def run_shards(
+    shards: list[Shard],
+    load_shard: Callable[[Shard], int],
+    checkpoint: Checkpoint,
+    max_workers: int,
+) -> ShardResult:
+    """Run load_shard for every shard not done yet, `max_workers` at a time
+
+    A failed shard is recorded and does not stop the others; running again
+    retries only failed and unfinished shards. Once every shard is done, the
+    checkpoint is cleared, so that the next run loads every shard again.
+    """
+    pending = [shard for shard in shards if not checkpoint.is_done(shard)]
+    failed: list[Shard] = []
+
+    def run(shard: Shard) -> None:
+        try:
+            rows = load_shard(shard)
+        except Exception as e:
+            checkpoint.mark_failed(shard, e)
+            failed.append(shard)
+            print(f"Shard {shard.name} failed: {e!r}")
+            return
+        checkpoint.mark_done(shard, rows)
+        print(f"Shard {shard.name}: {rows} rows")
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # The executor's queue is the work queue: workers take the next shard
+        list(executor.map(run, pending))
+
+    if not failed:
+        checkpoint.clear()
+    return ShardResult(
+        done=len(pending) - len(failed),
+        skipped=len(shards) - len(pending),
+        failed=failed,
+    )
+
+
+def load_nationwide(
+    checkpoint_path: str,
+    max_workers: int = 4,
+    page_workers: int = 2,
+    fresh: bool = False,
+) -> ShardResult:
+    """Upsert places of every area/sigungu, resuming an unfinished run
+
+    Once every shard is done, places still without an area (see
+    sync.unassigned_places) are deleted.
+
+    fresh: ignore the checkpoint of an unfinished run and load every shard
+    """
+    contentid_filter = ContentIdFilter()
+
+    def load_shard(shard: Shard) -> int:
+        params = AreaBasedListAPI.Params(
+            numOfRows=1000,
+            pageNo=1,
+            areaCode=shard.areacode,
+            sigunguCode=shard.sigungucode,
+            contentTypeId=None,
+            arrange="O",
+            listYN=None,
+            cat1=None,
+            cat2=None,
+            cat3=None,
+        )
+        items = AreaBasedListAPI.AreaBasedListAPI.iter_items(
+            params, num_of_rows=1000, max_workers=page_workers
+        )
+        contentids: set[int] = set()
+        with closing(items), db.get_session_with() as session:
+            upserted = bulk.upsert_places(
+                session, contentid_filter.unseen(place_rows(items), contentids)
+            )
+            if upserted:
+                data_version.bump(session)
+            session.commit()
+        contentid_filter.mark_loaded(contentids)
+        return upserted
+
+    checkpoint = Checkpoint(checkpoint_path)
+    if fresh:
+        checkpoint.clear()
+    result = run_shards(all_shards(), load_shard, checkpoint, max_workers)
+
+    if not result.failed:
+        # Every area was listed: places left without one are gone from TourAPI
+        with db.get_session_with() as session:
+            deleted = session.execute(unassigned_places()).rowcount
+            if deleted:
+                data_version.bump(session)
+            session.commit()
+        print(f"Deleted {deleted} places without an area")
+    return result
@@ -0,0 +1,135 @@
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from datetime import datetime
+import itertools
+import multiprocessing
+from typing import Iterable, Iterator
+
+from sqlalchemy.orm import Session
+
+from nyeok_database_core.bulk import PlaceRow
+from nyeok_database_core.tables import Place
+
+from .tourapi import AreaBasedListAPI
+
+
+def modifiedtime_to_datetime(modifiedtime: int) -> datetime:
+    """TourAPI time (e.g. 20240917153012, KST) to naive datetime"""
+    return datetime.strptime(str(modifiedtime), "%Y%m%d%H%M%S")
+
+
+def api_to_db_place(place: AreaBasedListAPI.Item) -> Place:
+    return Place(
+        contentid=place.contentid,
+        title=place.title,
+        coordinate=f"POINT({place.mapx} {place.mapy})",  # Well-Known Text
+        firstimage2=place.firstimage2,
+        areacode=place.areacode,
+        sigungucode=place.sigungucode,
+        modifiedtime=modifiedtime_to_datetime(place.modifiedtime),
+        contenttypeid=place.contenttypeid,
+        cat1=place.cat1,
+        cat2=place.cat2,
+        cat3=place.cat3,
+    )
+
+
+def api_to_place_row(place: AreaBasedListAPI.Item) -> PlaceRow:
+    return PlaceRow(
+        contentid=place.contentid,
+        title=place.title,
+        longitude=place.mapx,
+        latitude=place.mapy,
+        firstimage2=place.firstimage2,
+        areacode=place.areacode,
+        sigungucode=place.sigungucode,
+        modifiedtime=modifiedtime_to_datetime(place.modifiedtime),
+        contenttypeid=place.contenttypeid,
+        cat1=place.cat1,
+        cat2=place.cat2,
+        cat3=place.cat3,
+    )
+
+
+def place_rows(items: Iterable[AreaBasedListAPI.Item]) -> Iterator[PlaceRow]:
+    """Rows of places with image, converted lazily (for nyeok_database_core.bulk)"""
+    return map(api_to_place_row, filter(has_image, items))
+
+
+def has_image(place: AreaBasedListAPI.Item) -> bool:
+    return place.firstimage2 != ""
+
+
+def page_place_rows(content: bytes) -> list[PlaceRow]:
+    """Rows of places with image in a page content (see BaseAPI.iter_raw_pages)
+
+    Module-level, so that worker processes can run it.
+    """
+    root = AreaBasedListAPI.AreaBasedListAPI.rootT.model_validate_json(content)
+    return list(place_rows(root.response.body.items.item))
+
+
+def parallel_place_rows(
+    pages: Iterable[bytes], workers: int, ordered: bool = True
+) -> Iterator[PlaceRow]:
+    """Rows of every page, validated and converted by `workers` processes
+
+    Validation is CPU-bound: threads fetching pages and this generator would
+    share one core. ordered=True yields pages in the order of `pages`
+    (deterministic); otherwise pages are yielded as soon as they are done.
+    At most 2 * workers pages are submitted ahead of the consumer.
+    With workers <= 1, pages are converted in this process.
+    """
+    if workers <= 1:
+        for content in pages:
+            yield from page_place_rows(content)
+        return
+
+    contents = iter(pages)
+    # Not fork: threads fetching pages may hold locks at that moment
+    context = multiprocessing.get_context("forkserver")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        pending: deque[Future[list[PlaceRow]]] = deque()
+
+        def submit_next() -> None:
+            content = next(contents, None)
+            if content is not None:
+                pending.append(executor.submit(page_place_rows, content))
+
+        for _ in range(2 * workers):
+            submit_next()
+        try:
+            while pending:
+                if ordered:
+                    future = pending.popleft()
+                else:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    future = done.pop()
+                    pending.remove(future)
+                rows = future.result()
+                submit_next()
+                yield from rows
+        finally:
+            # A page failed or the consumer stopped early
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def insert_places(
+    session: Session,
+    items: Iterable[AreaBasedListAPI.Item],
+    batch_size: int = 1000,
+) -> int:
+    """Insert places with image through the ORM, flushing every `batch_size` rows
+
+    `items` is consumed lazily (e.g. BaseAPI.iter_items), and each batch is
+    expunged after flush, so memory does not grow with the number of items.
+    Nothing is committed: the caller commits (or rolls back) the whole load.
+    Returns the number of inserted places.
+    """
+    inserted = 0
+    for batch in itertools.batched(filter(has_image, items), batch_size):
+        session.add_all(map(api_to_db_place, batch))
+        session.flush()
+        session.expunge_all()
+        inserted += len(batch)
+    return inserted
@@ -0,0 +1,214 @@
+from contextlib import contextmanager
+import hashlib
+import re
+import time
+from typing import Iterable, Iterator, NamedTuple
+
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from nyeok_database_core import bulk, data_version, db
+from nyeok_database_core.bulk import PlaceRow
+from nyeok_database_core.tables import Place
+
+TABLE = Place.__tablename__
+STAGING_TABLE = f"{TABLE}_staging"
+OLD_TABLE = f"{TABLE}_old"
+
+# One load of place at a time (e.g. a retried or duplicated Kubernetes Job)
+ADVISORY_LOCK_KEY = 7_202_409_201
+# Longer identifiers are silently truncated by Postgres (NAMEDATALEN - 1)
+MAX_IDENTIFIER_BYTES = 63
+
+
+@contextmanager
+def place_load_lock() -> Iterator[None]:
+    """Raise RuntimeError if another process is loading place
+
+    The advisory lock is held by a dedicated session at session level, and
+    released at the end of the block, or when the process dies. The session is
+    in autocommit mode: it doesn't stay idle in a transaction during the load.
+    """
+    key = dict(key=ADVISORY_LOCK_KEY)
+    with db.get_session_with() as lock_session:
+        lock_session.connection(execution_options={"isolation_level": "AUTOCOMMIT"})
+        acquired = lock_session.execute(
+            text("SELECT pg_try_advisory_lock(:key)"), key
+        ).scalar()
+        if not acquired:
+            raise RuntimeError("Another load of place is running")
+        try:
+            yield
+        finally:
+            lock_session.execute(text("SELECT pg_advisory_unlock(:key)"), key)
+
+
+def suffixed_name(name: str, suffix: str) -> str:
+    """`name` + `suffix`, shortened with a hash of `name` to fit an identifier
+
+    "ix_place_..._contenttypeid" + "_staging" -> "ix_place_..._3f2a9c1e_staging"
+    """
+    if len((name + suffix).encode()) <= MAX_IDENTIFIER_BYTES:
+        return name + suffix
+    digest = hashlib.sha1(name.encode()).hexdigest()[:8]
+    keep = MAX_IDENTIFIER_BYTES - len(suffix) - len(digest) - 1
+    head = name.encode()[:keep].decode(errors="ignore")
+    return f"{head}_{digest}{suffix}"
+
+
+def grant_statement(privilege: str, table: str, grantee: str) -> str:
+    """GRANT statement; PUBLIC is a keyword, other grantees are role names"""
+    if grantee != "PUBLIC":
+        grantee = '"{}"'.format(grantee.replace('"', '""'))
+    return f"GRANT {privilege} ON {table} TO {grantee}"
+
+
+class IndexDefinition(NamedTuple):
+    name: str
+    definition: str  # pg_indexes.indexdef
+
+
+def staging_index_statement(index: IndexDefinition) -> str:
+    """CREATE INDEX statement of `index`, for the staging table
+
+    "CREATE INDEX idx_place_coordinate ON public.place USING gist (coordinate)"
+    -> "CREATE INDEX idx_place_coordinate_staging ON public.place_staging USING ..."
+    """
+    match = re.fullmatch(
+        r"(CREATE (?:UNIQUE )?INDEX) (\S+) ON (?:ONLY )?(\S+) (USING .*)",
+        index.definition,
+    )
+    if match is None:
+        raise ValueError(f"Unexpected index definition: {index.definition}")
+    create, _, _, using = match.groups()
+    staging_name = suffixed_name(index.name, "_staging")
+    return f"{create} {staging_name} ON public.{STAGING_TABLE} {using}"
+
+
+def place_indexes(session: Session) -> list[IndexDefinition]:
+    """Indexes of place, except the ones backing constraints (primary key)"""
+    rows = session.execute(
+        text(
+            """
+            SELECT indexname, indexdef FROM pg_indexes
+            WHERE schemaname = 'public' AND tablename = :table
+            AND indexname NOT IN (
+                SELECT conname FROM pg_constraint
+                WHERE conrelid = CAST(:qualified_table AS regclass)
+            )
+            ORDER BY indexname
+            """
+        ),
+        dict(table=TABLE, qualified_table=f"public.{TABLE}"),
+    )
+    return [IndexDefinition(name, definition) for name, definition in rows]
+
+
+def place_grants(session: Session) -> list[tuple[str, str]]:
+    """(grantee, privilege) of place: CREATE TABLE ... LIKE doesn't copy them"""
+    rows = session.execute(
+        text(
+            """
+            SELECT grantee, privilege_type FROM information_schema.role_table_grants
+            WHERE table_schema = 'public' AND table_name = :table
+            AND grantee <> current_user
+            """
+        ),
+        dict(table=TABLE),
+    )
+    return [(grantee, privilege) for grantee, privilege in rows]
+
+
+def load_staging(session: Session, rows: Iterable[PlaceRow]) -> int:
+    """Fill a new staging table, then build its indexes and statistics"""
+    # Leftovers of a failed run
+    session.execute(text(f"DROP TABLE IF EXISTS {STAGING_TABLE}"))
+    session.execute(text(f"DROP TABLE IF EXISTS {OLD_TABLE}"))
+    # No index yet: loading without index maintenance is much faster
+    session.execute(
+        text(
+            f"CREATE TABLE {STAGING_TABLE} "
+            f"(LIKE {TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        )
+    )
+    copied = bulk.copy_places(session, rows, table=STAGING_TABLE)
+    session.commit()
+
+    session.execute(
+        text(
+            f"ALTER TABLE {STAGING_TABLE} "
+            f"ADD CONSTRAINT {STAGING_TABLE}_pkey PRIMARY KEY (contentid)"
+        )
+    )
+    for index in place_indexes(session):
+        session.execute(text(staging_index_statement(index)))
+    for grantee, privilege in place_grants(session):
+        session.execute(text(grant_statement(privilege, STAGING_TABLE, grantee)))
+    session.commit()
+
+    # Planner statistics are ready when the table goes live
+    session.execute(text(f"ANALYZE {STAGING_TABLE}"))
+    session.commit()
+    return copied
+
+
+def swap_staging(session: Session, lock_timeout: str = "5s") -> None:
+    """Replace place by the staging table in one short transaction
+
+    Readers see either the old or the new table, never a partial one. Renames
+    only touch the catalog; waiting for the ACCESS EXCLUSIVE lock is bounded
+    by lock_timeout so that queued readers are not blocked for long.
+    """
+    indexes = place_indexes(session)
+    session.execute(text(f"SET LOCAL lock_timeout = '{lock_timeout}'"))
+    session.execute(text(f"ALTER TABLE {TABLE} RENAME TO {OLD_TABLE}"))
+    session.execute(
+        text(
+            f"ALTER TABLE {OLD_TABLE} "
+            f"RENAME CONSTRAINT {TABLE}_pkey TO {OLD_TABLE}_pkey"
+        )
+    )
+    for index in indexes:
+        old_name = suffixed_name(index.name, "_old")
+        session.execute(text(f"ALTER INDEX {index.name} RENAME TO {old_name}"))
+
+    session.execute(text(f"ALTER TABLE {STAGING_TABLE} RENAME TO {TABLE}"))
+    session.execute(
+        text(
+            f"ALTER TABLE {TABLE} "
+            f"RENAME CONSTRAINT {STAGING_TABLE}_pkey TO {TABLE}_pkey"
+        )
+    )
+    for index in indexes:
+        staging_name = suffixed_name(index.name, "_staging")
+        session.execute(text(f"ALTER INDEX {staging_name} RENAME TO {index.name}"))
+    # Caches of the old table (e.g. map tiles) are stale from this commit on
+    data_version.bump(session)
+    session.commit()
+
+
+def reload_places(
+    rows: Iterable[PlaceRow], lock_timeout: str = "5s", swap_attempts: int = 5
+) -> int:
+    """Replace every row of place without readers seeing a partial table
+
+    Returns the number of loaded rows. Raises if another load is running.
+    """
+    with place_load_lock():
+        with db.get_session_with() as session:
+            loaded = load_staging(session, rows)
+
+            for attempt in range(1, swap_attempts + 1):
+                try:
+                    swap_staging(session, lock_timeout)
+                    break
+                except OperationalError:  # lock_timeout: long query on place
+                    session.rollback()
+                    if attempt == swap_attempts:
+                        raise
+                    time.sleep(attempt)
+
+            session.execute(text(f"DROP TABLE {OLD_TABLE}"))
+            session.commit()
+    return loaded
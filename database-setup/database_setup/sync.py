@@ -0,0 +1,161 @@
+from contextlib import closing
+from datetime import datetime, timedelta
+from typing import Iterable, Iterator, NamedTuple
+
+from sqlalchemy import Delete, Select, delete, exists, select
+from sqlalchemy.orm import Session
+
+from nyeok_database_core import bulk, data_version
+from nyeok_database_core.tables import Place, SyncState
+
+from .pipeline import has_image, modifiedtime_to_datetime, place_rows
+from .tourapi import AreaBasedListAPI
+
+
+class Listing:
+    """What was seen while listing an area"""
+
+    def __init__(self) -> None:
+        self.contentids: set[int] = set()  # Places with image
+        self.newest: datetime | None = None  # Largest modifiedtime
+
+    def add(self, place: AreaBasedListAPI.Item, modifiedtime: datetime) -> None:
+        if has_image(place):
+            self.contentids.add(place.contentid)
+        if self.newest is None or modifiedtime > self.newest:
+            self.newest = modifiedtime
+
+
+class SyncResult(NamedTuple):
+    upserted: int
+    deleted: int
+    reconciled: bool
+    high_water_mark: datetime | None
+
+
+def changed_places(
+    places: Iterable[AreaBasedListAPI.Item],
+    high_water_mark: datetime | None,
+    listing: Listing,
+) -> Iterator[AreaBasedListAPI.Item]:
+    """Places modified at or after high_water_mark (all if None)
+
+    `places` should be ordered by modifiedtime, newest first (arrange="Q"):
+    iteration stops at the first older place, so older pages are never
+    fetched. Yielded places are recorded in `listing`.
+    """
+    for place in places:
+        modifiedtime = modifiedtime_to_datetime(place.modifiedtime)
+        if high_water_mark is not None and modifiedtime < high_water_mark:
+            return
+        listing.add(place, modifiedtime)
+        yield place
+
+
+def unfilled_places_exist(
+    areacode: int, sigungucode: int | None
+) -> Select[tuple[bool]]:
+    """Whether the area has places never filled by database_setup
+
+    Rows that existed before migration 5c1f0e7d9a3b have contenttypeid 0 and
+    empty categories until they are upserted again.
+    """
+    condition = (Place.areacode == areacode) & (Place.contenttypeid == 0)
+    if sigungucode is not None:
+        condition &= Place.sigungucode == sigungucode
+    return select(exists().where(condition))
+
+
+def unassigned_places() -> Delete:
+    """Places still without an area (areacode 0)
+
+    Rows that existed before migration 2ba3abe1e672 have areacode 0 until they
+    are upserted again. Once every area was listed, the remaining ones are no
+    longer on TourAPI. Not part of the reconcile of one area, which can't tell
+    them from places of areas not synced yet.
+    """
+    return delete(Place).where(Place.areacode == 0)
+
+
+def sync_area(
+    session: Session,
+    areacode: int,
+    sigungucode: int | None = None,
+    reconcile_interval: timedelta = timedelta(days=7),
+    force_reconcile: bool = False,
+    num_of_rows: int = 1000,
+) -> SyncResult:
+    """Upsert places of an area modified since the last sync
+
+    Every `reconcile_interval` (or with force_reconcile) the whole area is
+    listed instead, and places that disappeared from TourAPI are deleted. The
+    area is also listed while it has unfilled places (see unfilled_places_exist),
+    since only a full listing upserts the unchanged ones.
+    """
+    state = session.get(SyncState, (areacode, sigungucode or 0))
+    now = datetime.now()
+    reconcile = (
+        force_reconcile
+        or bool(session.scalar(unfilled_places_exist(areacode, sigungucode)))
+        or state is None
+        or state.last_reconciled_at is None
+        or now - state.last_reconciled_at >= reconcile_interval
+    )
+    previous_high_water_mark = state.high_water_mark if state is not None else None
+
+    params = AreaBasedListAPI.Params(
+        numOfRows=num_of_rows,
+        pageNo=1,
+        areaCode=areacode,
+        sigunguCode=sigungucode,
+        contentTypeId=None,
+        arrange="Q",  # 수정일순, 대표이미지 보장
+        listYN=None,
+        cat1=None,
+        cat2=None,
+        cat3=None,
+    )
+    listing = Listing()
+    with closing(
+        AreaBasedListAPI.AreaBasedListAPI.iter_items(
+            params, num_of_rows=num_of_rows, max_workers=4
+        )
+    ) as places:
+        # Streamed into a temp table with COPY, then upserted in one statement
+        upserted = bulk.upsert_places(
+            session,
+            place_rows(
+                changed_places(
+                    places, None if reconcile else previous_high_water_mark, listing
+                )
+            ),
+        )
+
+    deleted = 0
+    if reconcile and listing.contentids:  # Empty: more likely an API failure
+        statement = delete(Place).where(
+            Place.areacode == areacode, Place.contentid.not_in(listing.contentids)
+        )
+        if sigungucode is not None:
+            statement = statement.where(Place.sigungucode == sigungucode)
+        deleted = session.execute(statement).rowcount
+
+    if upserted or deleted:
+        data_version.bump(session)
+
+    # Advance the mark in the same transaction as the upsert
+    high_water_mark = max(
+        filter(None, [listing.newest, previous_high_water_mark]), default=None
+    )
+    session.merge(
+        SyncState(
+            areacode=areacode,
+            sigungucode=sigungucode or 0,
+            high_water_mark=high_water_mark or datetime.min,
+            last_reconciled_at=(
+                now if reconcile else state.last_reconciled_at if state else None
+            ),
+        )
+    )
+    session.commit()
+    return SyncResult(upserted, deleted, reconcile, high_water_mark)
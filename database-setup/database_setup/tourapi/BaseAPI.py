@@ -1,11 +1,18 @@
-from typing import Any, Generic, Type, TypeVar
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import closing
+import random
+import time
+from typing import Any, Callable, Generic, Iterator, NamedTuple, Type, TypeVar
 import pydantic
 from pydantic import BaseModel
-from pydantic_core import from_json
 import requests
+from requests.adapters import HTTPAdapter
 import urllib.parse
 from ..env import env
-from .types import Body, ResponseRoot
+from .errors import TourAPIError, parse_xml_error
+from .response_cache import ResponseCache
+from .types import Body, Header, PageBody, PageRoot, ResponseRoot
 
 
 class BaseParams(BaseModel):
@@ -19,17 +26,82 @@ class BaseItem(BaseModel):
 
 P = TypeVar("P", bound=BaseParams)
 I = TypeVar("I", bound=BaseItem)
+T = TypeVar("T")
+R = TypeVar("R", bound=BaseModel)
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class RawPage(NamedTuple):
+    content: bytes  # Response as received
+    body: PageBody  # Without items
+
+
+def is_retryable(error: Exception) -> bool:
+    if isinstance(error, TourAPIError):
+        return error.retryable
+    if isinstance(error, (requests.ConnectionError, requests.Timeout)):
+        return True
+    if isinstance(error, requests.RequestException) and error.response is not None:
+        return error.response.status_code in RETRYABLE_STATUS_CODES
+    return False
 
 
 class BaseAPI(Generic[P, I]):
     base_url: str
 
-    def __init__(self, base_url: str, paramT: Type[P], itemT: Type[I]):
+    def __init__(
+        self,
+        base_url: str,
+        paramT: Type[P],
+        itemT: Type[I],
+        timeout: tuple[float, float] = (3.05, 30),  # (connect, read) seconds
+        max_retries: int = 4,
+        backoff_second: float = 0.5,  # 0.5, 1, 2, 4, ... (with jitter)
+        max_backoff_second: float = 30,
+        pool_maxsize: int = 8,  # >= max_workers of get_items_all
+        cache: ResponseCache | None = None,  # Opt-in, see ResponseCache
+    ):
         self.base_url = base_url
         self.paramT = paramT
         self.itemT = itemT
+        # Specialized once: ResponseRoot[itemT] per page costs a cache lookup and
+        # more, while the validator of this class is reused as is
+        self.rootT: Type[ResponseRoot[I]] = ResponseRoot[itemT]  # type: ignore
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_second = backoff_second
+        self.max_backoff_second = max_backoff_second
+        self.cache = cache
+
+        # Keep-alive connections, shared by the threads of get_items_all
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _with_retry(self, call: Callable[[], T]) -> T:
+        """Retry `call` on transient errors with exponential backoff"""
+        attempt = 0
+        while True:
+            try:
+                return call()
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    raise
+            backoff = min(self.backoff_second * 2**attempt, self.max_backoff_second)
+            time.sleep(random.uniform(backoff / 2, backoff))
+            attempt += 1
 
     def get(self, params: P) -> ResponseRoot[I]:
+        param_dict = self._param_dict(params)
+        content, cached = self._load(param_dict)
+        root = self._validate(content, self.rootT)
+        if not cached:
+            self._store(param_dict, content, root.response.header)
+        return root
+
+    def _param_dict(self, params: P) -> dict[str, Any]:
         if self.base_url.endswith("/"):
             raise ValueError("base_url should not end with '/'")
 
@@ -39,44 +111,165 @@ class BaseAPI(Generic[P, I]):
         param_dict["MobileOS"] = "AND"
         param_dict["MobileApp"] = "Nyeok"
         param_dict["_type"] = "json"
+        return param_dict
 
+    def _load(self, param_dict: dict[str, Any]) -> tuple[bytes, bool]:
+        """Response content, and whether it came from the cache"""
+        content = self.cache.load(self.base_url, param_dict) if self.cache else None
+        if content is not None:
+            return content, True
+        return self._fetch(param_dict), False
+
+    def _fetch(self, param_dict: dict[str, Any]) -> bytes:
         # Encode manually: naive `requests.get` converts % to %25
         param_string = urllib.parse.urlencode(param_dict, safe="%")
-        response: requests.Response = requests.get(self.base_url, params=param_string)
+        response: requests.Response = self.session.get(
+            self.base_url, params=param_string, timeout=self.timeout
+        )
 
         if not response.status_code == 200:
-            raise requests.RequestException("Failed to get tourapi", response=response)
+            raise requests.HTTPError("Failed to get tourapi", response=response)
+        return response.content
 
+    @staticmethod
+    def _validate(content: bytes, rootT: Type[R]) -> R:
         try:
-            return ResponseRoot[self.itemT].model_validate(from_json(response.text))
+            # From bytes: no decoding to str, no intermediate Python objects
+            return rootT.model_validate_json(content)
         except pydantic.ValidationError as e:
-            raise e from e
-        except ValueError as e:
-            # TODO: xml parse for error code
-            raise ValueError(
-                "Failed to deserialize response.text", response.text
+            if e.errors()[0]["type"] != "json_invalid":
+                raise e from e
+            # Errors are returned as XML even if _type=json
+            text = content.decode(errors="replace")
+            xml_error = parse_xml_error(text)
+            if xml_error is not None:
+                raise xml_error from e
+            # Neither JSON nor an XML error, e.g. a truncated body or a gateway
+            # error page: treated like a server-side error
+            raise TourAPIError(
+                f"Failed to deserialize response.content: {text[:200]}",
+                result_code=None,
+                retryable=True,
             ) from e
 
-    def get_body(self, params: P) -> Body[I]:
+    def _store(
+        self, param_dict: dict[str, Any], content: bytes, header: Header
+    ) -> None:
+        # Only successful responses: errors are worth asking again
+        if self.cache and header.resultCode == "0000":
+            self.cache.store(self.base_url, param_dict, content)
+
+    @staticmethod
+    def _check(header: Header) -> None:
+        if header.resultCode != "0000":
+            raise TourAPIError.from_result_code(header.resultCode, header.resultMsg)
+
+    def _get_body_once(self, params: P) -> Body[I]:
         root = self.get(params)
-        if root.response.header.resultCode != "0000":
-            raise Exception(
-                f"API resultCode: {root.response.header.resultCode}\nAPI resultMsg: {root.response.header.resultMsg}"
-            )
+        self._check(root.response.header)
         return root.response.body
 
+    def get_body(self, params: P) -> Body[I]:
+        """Body of a successful response. Transient errors are retried"""
+        return self._with_retry(lambda: self._get_body_once(params))
+
     def get_items(self, params: P) -> list[I]:
         return self.get_body(params).items.item
 
-    def get_items_all(self, params: P) -> list[I]:
+    def _get_raw_page_once(self, params: P) -> RawPage:
+        param_dict = self._param_dict(params)
+        content, cached = self._load(param_dict)
+        # Items are left in the content, for validation elsewhere
+        root = self._validate(content, PageRoot)
+        self._check(root.response.header)
+        if not cached:
+            self._store(param_dict, content, root.response.header)
+        return RawPage(content, root.response.body)
+
+    def get_raw_page(self, params: P) -> RawPage:
+        """Content of a successful response, items not validated (see get_body)"""
+        return self._with_retry(lambda: self._get_raw_page_once(params))
+
+    @staticmethod
+    def page_params(params: P, page_no: int, num_of_rows: int) -> P:
+        return params.model_copy(update={"numOfRows": num_of_rows, "pageNo": page_no})
+
+    def _iter_prefetched(
+        self,
+        get_page: Callable[[P], T],
+        page_body: Callable[[T], PageBody],
+        params: P,
+        num_of_rows: int,
+        max_workers: int,
+    ) -> Iterator[T]:
+        """get_page of every page, in page order
+
+        Page 1 tells totalCount, then the remaining pages are fetched by
+        `max_workers` threads (1: one after another). At most `max_workers`
+        pages are fetched ahead of the consumer, so memory stays bounded.
+        """
         # TODO: client doesn't have to set numOfRows, pageNo
-        items: list[I] = []
-        params.numOfRows = 10000  # Don't know maximum
-        params.pageNo = 1
-        while True:
-            body = self.get_body(params)
-            items.extend(body.items.item)
-            if len(items) >= body.totalCount:
-                break
-            params.pageNo += 1
-        return items
+        first_page = get_page(self.page_params(params, 1, num_of_rows))
+        page_numbers = iter(range(2, page_body(first_page).totalPage + 1))
+        yield first_page
+        del first_page
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending: deque[Future[T]] = deque()
+
+            def submit_next() -> None:
+                page_no = next(page_numbers, None)
+                if page_no is not None:
+                    page_params = self.page_params(params, page_no, num_of_rows)
+                    pending.append(executor.submit(get_page, page_params))
+
+            for _ in range(max_workers):
+                submit_next()
+            try:
+                while pending:
+                    page = pending.popleft().result()
+                    submit_next()
+                    yield page
+            finally:
+                # A page failed or the consumer stopped early
+                executor.shutdown(wait=False, cancel_futures=True)
+
+    def iter_pages(
+        self,
+        params: P,
+        num_of_rows: int = 10000,  # Don't know maximum
+        max_workers: int = 8,
+    ) -> Iterator[Body[I]]:
+        """Bodies of every page, in page order (see _iter_prefetched)"""
+        return self._iter_prefetched(
+            self.get_body, lambda body: body, params, num_of_rows, max_workers
+        )
+
+    def iter_raw_pages(
+        self,
+        params: P,
+        num_of_rows: int = 10000,
+        max_workers: int = 8,
+    ) -> Iterator[bytes]:
+        """Content of every page, in page order, items not validated
+
+        For validation in other processes (see database_setup.pipeline).
+        """
+        pages = self._iter_prefetched(
+            self.get_raw_page, lambda page: page.body, params, num_of_rows, max_workers
+        )
+        with closing(pages):
+            for page in pages:
+                yield page.content
+
+    def iter_items(
+        self, params: P, num_of_rows: int = 10000, max_workers: int = 8
+    ) -> Iterator[I]:
+        for body in self.iter_pages(params, num_of_rows, max_workers):
+            yield from body.items.item
+
+    def get_items_all(
+        self, params: P, num_of_rows: int = 10000, max_workers: int = 8
+    ) -> list[I]:
+        """Items of every page, in page order (see iter_pages)"""
+        return list(self.iter_items(params, num_of_rows, max_workers))
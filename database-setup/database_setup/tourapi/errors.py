@@ -0,0 +1,53 @@
+import xml.etree.ElementTree as ElementTree
+
+# TourAPI result codes (JSON header.resultCode, XML returnReasonCode)
+#  1 APPLICATION_ERROR          10 INVALID_REQUEST_PARAMETER_ERROR
+#  2 DB_ERROR                   11 NO_MANDATORY_REQUEST_PARAMETERS_ERROR
+#  3 NODATA_ERROR               12 NO_OPENAPI_SERVICE_ERROR
+#  4 HTTP_ERROR                 20 SERVICE_ACCESS_DENIED_ERROR
+#  5 SERVICETIMEOUT_ERROR       22 LIMITED_NUMBER_OF_SERVICE_REQUESTS_EXCEEDS_ERROR
+# 99 UNKNOWN_ERROR              30 SERVICE_KEY_IS_NOT_REGISTERED_ERROR
+#                               31 DEADLINE_HAS_EXPIRED_ERROR
+#                               32 UNREGISTERED_IP_ERROR
+# Server side, transient: worth retrying. Others fail the same way again.
+RETRYABLE_RESULT_CODES: set[int] = {1, 2, 4, 5, 99}
+
+
+class TourAPIError(Exception):
+    def __init__(self, message: str, result_code: str | None, retryable: bool):
+        super().__init__(message)
+        self.result_code = result_code
+        self.retryable = retryable
+
+    @staticmethod
+    def from_result_code(result_code: str, message: str) -> "TourAPIError":
+        try:
+            retryable = int(result_code) in RETRYABLE_RESULT_CODES
+        except ValueError:
+            retryable = False
+        return TourAPIError(
+            f"API resultCode: {result_code}\nAPI resultMsg: {message}",
+            result_code=result_code,
+            retryable=retryable,
+        )
+
+
+def parse_xml_error(text: str) -> TourAPIError | None:
+    """Error returned as XML (even with _type=json), e.g. for an invalid key
+
+    <OpenAPI_ServiceResponse><cmmMsgHeader>
+        <errMsg>SERVICE ERROR</errMsg>
+        <returnAuthMsg>SERVICE_KEY_IS_NOT_REGISTERED_ERROR</returnAuthMsg>
+        <returnReasonCode>30</returnReasonCode>
+    </cmmMsgHeader></OpenAPI_ServiceResponse>
+    """
+    try:
+        root = ElementTree.fromstring(text)
+    except ElementTree.ParseError:
+        return None
+
+    result_code = root.findtext(".//returnReasonCode")
+    if result_code is None:
+        return None
+    message = root.findtext(".//returnAuthMsg") or root.findtext(".//errMsg") or ""
+    return TourAPIError.from_result_code(result_code.strip(), message.strip())
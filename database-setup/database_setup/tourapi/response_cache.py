@@ -0,0 +1,79 @@
+import gzip
+import hashlib
+import os
+import tempfile
+import time
+from typing import Any
+import urllib.parse
+
+# Differs between developers and machines, never part of the key
+EXCLUDED_PARAMS = {"serviceKey"}
+
+
+class CacheMissError(Exception):
+    """No cached response for a request in replay only mode"""
+
+
+class ResponseCache:
+    """Successful TourAPI responses on disk, gzip compressed
+
+    An entry expires `ttl_second` after it was stored (None: never). With
+    `replay_only`, the network is never used: every request must be cached
+    (expired entries are served too), otherwise CacheMissError is raised.
+    Files are written atomically, so threads and processes can share it.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        ttl_second: float | None = 24 * 60 * 60,
+        replay_only: bool = False,
+    ):
+        self.directory = directory
+        self.ttl_second = ttl_second
+        self.replay_only = replay_only
+
+    @staticmethod
+    def key(url: str, params: dict[str, Any]) -> str:
+        """Same key whatever the order of params"""
+        canonical = sorted(
+            (name, str(value))
+            for name, value in params.items()
+            if name not in EXCLUDED_PARAMS
+        )
+        request = f"{url}?{urllib.parse.urlencode(canonical)}"
+        return hashlib.sha256(request.encode()).hexdigest()
+
+    def path(self, key: str) -> str:
+        # Two levels, so a directory doesn't hold every entry
+        return os.path.join(self.directory, key[:2], f"{key}.json.gz")
+
+    def load(self, url: str, params: dict[str, Any]) -> bytes | None:
+        """Cached response content, None if missing or expired"""
+        key = self.key(url, params)
+        path = self.path(key)
+        try:
+            age = time.time() - os.path.getmtime(path)
+            if self.replay_only or self.ttl_second is None or age < self.ttl_second:
+                with open(path, "rb") as file:
+                    return gzip.decompress(file.read())
+        except FileNotFoundError:
+            pass
+
+        if self.replay_only:
+            raise CacheMissError(f"Not cached: {url} (key {key})")
+        return None
+
+    def store(self, url: str, params: dict[str, Any], content: bytes) -> None:
+        path = self.path(self.key(url, params))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        file_descriptor, temp_path = tempfile.mkstemp(
+            dir=os.path.dirname(path), suffix=".tmp"
+        )
+        try:
+            with os.fdopen(file_descriptor, "wb") as file:
+                file.write(gzip.compress(content))
+            os.replace(temp_path, path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
@@ -20,8 +20,7 @@ class Header(BaseModel):
     resultMsg: str
 
 
-class Body(BaseModel, Generic[ItemT]):
-    items: Items[ItemT]
+class PageBody(BaseModel):
     numOfRows: int  # 한 페이지 결과 수
     pageNo: int  # 페이지 번호
     totalCount: int  # 전체 결과 수
@@ -31,5 +30,19 @@ class Body(BaseModel, Generic[ItemT]):
         return math.ceil(self.totalCount / self.numOfRows)
 
 
+class Body(PageBody, Generic[ItemT]):
+    items: Items[ItemT]
+
+
 class Items(BaseModel, Generic[ItemT]):
     item: list[ItemT]
+
+
+# Same response without items: validated without building the items
+class PageRoot(BaseModel):
+    response: PageResponse
+
+
+class PageResponse(BaseModel):
+    header: Header
+    body: PageBody
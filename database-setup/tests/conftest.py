@@ -0,0 +1,4 @@
+import os
+
+# database_setup.env requires it at import time (no .secret in tests)
+os.environ.setdefault("DATAKR_API_KEY", "test-key")
@@ -0,0 +1,192 @@
+import threading
+import time
+
+import pytest
+import requests
+
+from database_setup.tourapi.BaseAPI import BaseAPI, BaseItem, BaseParams
+from database_setup.tourapi.errors import TourAPIError, parse_xml_error
+from database_setup.tourapi.types import Body, Items
+
+
+class Params(BaseParams):
+    areaCode: int
+
+
+class Item(BaseItem):
+    contentid: int
+
+
+class FakeAPI(BaseAPI[Params, Item]):
+    """Serves `total_count` items, page by page, without network"""
+
+    def __init__(self, total_count: int, fail_page: int | None = None):
+        super().__init__("http://localhost/fake", Params, Item)
+        self.total_count = total_count
+        self.fail_page = fail_page
+        self.requested_pages: list[int] = []
+        self._lock = threading.Lock()
+
+    def get_body(self, params: Params) -> Body[Item]:
+        with self._lock:
+            self.requested_pages.append(params.pageNo)
+        if params.pageNo == self.fail_page:
+            raise RuntimeError(f"page {params.pageNo} failed")
+        # Later pages answer first: results must still be in page order
+        time.sleep(0.01 / params.pageNo)
+
+        start = (params.pageNo - 1) * params.numOfRows
+        stop = min(start + params.numOfRows, self.total_count)
+        return Body[Item](
+            items=Items[Item](item=[Item(contentid=i) for i in range(start, stop)]),
+            numOfRows=params.numOfRows,
+            pageNo=params.pageNo,
+            totalCount=self.total_count,
+        )
+
+
+def test_get_items_all_keeps_page_order():
+    api = FakeAPI(total_count=95)
+    params = Params(numOfRows=1, pageNo=1, areaCode=1)
+
+    items = api.get_items_all(params, num_of_rows=10, max_workers=4)
+
+    assert [item.contentid for item in items] == list(range(95))
+    assert api.requested_pages[0] == 1
+    assert sorted(api.requested_pages) == list(range(1, 11))
+    assert params.pageNo == 1  # caller's params are not modified
+
+
+def test_get_items_all_single_page():
+    api = FakeAPI(total_count=3)
+    items = api.get_items_all(Params(numOfRows=1, pageNo=1, areaCode=1))
+    assert len(items) == 3
+    assert api.requested_pages == [1]
+
+
+def test_get_items_all_raises_page_error():
+    api = FakeAPI(total_count=100, fail_page=3)
+    with pytest.raises(RuntimeError):
+        api.get_items_all(
+            Params(numOfRows=1, pageNo=1, areaCode=1), num_of_rows=10, max_workers=2
+        )
+
+
+class FakeResponse:
+    def __init__(self, status_code: int, text: str):
+        self.status_code = status_code
+        self.content = text.encode()
+
+
+class FakeSession:
+    """Returns the given responses (or raises the given errors) in order"""
+
+    def __init__(self, responses: list[FakeResponse | Exception]):
+        self.responses = responses
+        self.calls = 0
+
+    def get(self, url: str, params: str, timeout: tuple[float, float]) -> FakeResponse:
+        response = self.responses[self.calls]
+        self.calls += 1
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+OK_JSON = """{"response": {
+    "header": {"resultCode": "0000", "resultMsg": "OK"},
+    "body": {"items": {"item": [{"contentid": 1}]},
+             "numOfRows": 10, "pageNo": 1, "totalCount": 1}}}"""
+
+
+def xml_error(code: int, message: str) -> str:
+    return (
+        "<OpenAPI_ServiceResponse><cmmMsgHeader><errMsg>SERVICE ERROR</errMsg>"
+        f"<returnAuthMsg>{message}</returnAuthMsg>"
+        f"<returnReasonCode>{code:02d}</returnReasonCode>"
+        "</cmmMsgHeader></OpenAPI_ServiceResponse>"
+    )
+
+
+def api_with(responses: list[FakeResponse | Exception]) -> BaseAPI[Params, Item]:
+    api = BaseAPI("http://localhost/fake", Params, Item, backoff_second=0)
+    api.session = FakeSession(responses)  # type: ignore
+    return api
+
+
+def test_parse_xml_error():
+    error = parse_xml_error(xml_error(30, "SERVICE_KEY_IS_NOT_REGISTERED_ERROR"))
+    assert error is not None
+    assert error.result_code == "30"
+    assert not error.retryable
+
+    error = parse_xml_error(xml_error(99, "UNKNOWN_ERROR"))
+    assert error is not None and error.retryable
+
+    assert parse_xml_error("not xml") is None
+
+
+def test_get_body_retries_transient_errors():
+    api = api_with(
+        [
+            requests.ConnectionError("reset"),
+            FakeResponse(503, "Service Unavailable"),
+            FakeResponse(200, xml_error(1, "APPLICATION_ERROR")),
+            FakeResponse(200, OK_JSON),
+        ]
+    )
+    body = api.get_body(Params(numOfRows=10, pageNo=1, areaCode=1))
+    assert [item.contentid for item in body.items.item] == [1]
+    assert api.session.calls == 4  # type: ignore
+
+
+def test_get_body_retries_malformed_responses():
+    api = api_with(
+        [FakeResponse(200, "<html>Bad Gateway</html>"), FakeResponse(200, OK_JSON)]
+    )
+    body = api.get_body(Params(numOfRows=10, pageNo=1, areaCode=1))
+    assert [item.contentid for item in body.items.item] == [1]
+
+    api = api_with([FakeResponse(200, '{"response": ')] * 2)
+    api.max_retries = 1
+    with pytest.raises(TourAPIError) as error:
+        api.get_body(Params(numOfRows=10, pageNo=1, areaCode=1))
+    assert error.value.result_code is None
+
+
+def test_get_raw_page():
+    api = api_with([FakeResponse(503, ""), FakeResponse(200, OK_JSON)])
+    page = api.get_raw_page(Params(numOfRows=10, pageNo=1, areaCode=1))
+    assert page.content == OK_JSON.encode()
+    assert page.body.totalPage == 1
+
+
+def test_get_body_does_not_retry_fatal_errors():
+    api = api_with([FakeResponse(200, xml_error(22, "LIMITED_NUMBER_OF_SERVICE"))])
+    with pytest.raises(TourAPIError) as error:
+        api.get_body(Params(numOfRows=10, pageNo=1, areaCode=1))
+    assert error.value.result_code == "22"
+    assert api.session.calls == 1  # type: ignore
+
+
+def test_get_body_gives_up_after_max_retries():
+    api = api_with([FakeResponse(500, "")] * 10)
+    api.max_retries = 2
+    with pytest.raises(requests.HTTPError):
+        api.get_body(Params(numOfRows=10, pageNo=1, areaCode=1))
+    assert api.session.calls == 3  # type: ignore
+
+
+def test_iter_pages_prefetch_is_bounded():
+    api = FakeAPI(total_count=100)
+    pages = api.iter_pages(
+        Params(numOfRows=1, pageNo=1, areaCode=1), num_of_rows=10, max_workers=2
+    )
+
+    assert next(pages).pageNo == 1
+    assert next(pages).pageNo == 2
+    time.sleep(0.05)  # Let the workers run ahead as far as they can
+    assert max(api.requested_pages) <= 4
+
+    pages.close()  # Remaining pages are cancelled
+    assert max(api.requested_pages) <= 4
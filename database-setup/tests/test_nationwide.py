@@ -0,0 +1,69 @@
+from database_setup.nationwide import (
+    Checkpoint,
+    ContentIdFilter,
+    Shard,
+    all_shards,
+    run_shards,
+)
+from database_setup.pipeline import api_to_place_row
+from database_setup.tourapi.AreaCode import AreaCode
+
+from .test_pipeline import item
+
+
+def test_all_shards():
+    shards = all_shards()
+
+    assert Shard(1, AreaCode.서울.마포구, "서울 마포구") in shards
+    assert Shard(39, AreaCode.제주도.서귀포시, "제주도 서귀포시") in shards
+    assert len({shard.key for shard in shards}) == len(shards)
+    assert {shard.areacode for shard in shards} == {
+        *range(1, 9),
+        *range(31, 40),
+    }
+
+
+def test_run_shards_resumes_from_checkpoint(tmp_path):
+    path = str(tmp_path / "checkpoint.json")
+    shards = [Shard(1, 1, "a"), Shard(1, 2, "b"), Shard(2, 1, "c")]
+    loaded: list[Shard] = []
+
+    def load_shard(shard: Shard) -> int:
+        if shard.name == "b":
+            raise RuntimeError("API down")
+        loaded.append(shard)
+        return 10
+
+    def load_shard_again(shard: Shard) -> int:
+        loaded.append(shard)
+        return 5
+
+    result = run_shards(shards, load_shard, Checkpoint(path), max_workers=2)
+    assert (result.done, result.skipped, result.failed) == (2, 0, [shards[1]])
+    assert sorted(loaded) == [shards[0], shards[2]]
+
+    # Only the failed shard is loaded again
+    loaded.clear()
+    result = run_shards(shards, load_shard_again, Checkpoint(path), max_workers=2)
+    assert (result.done, result.skipped, result.failed) == (1, 2, [])
+    assert loaded == [shards[1]]
+
+    # Every shard is done: the next run starts over
+    assert not (tmp_path / "checkpoint.json").exists()
+    assert not (tmp_path / "checkpoint.json.tmp").exists()
+    loaded.clear()
+    result = run_shards(shards, load_shard_again, Checkpoint(path), max_workers=2)
+    assert (result.done, result.skipped) == (3, 0)
+
+
+def test_content_id_filter():
+    rows = [api_to_place_row(item(contentid, "image")) for contentid in (1, 2)]
+    contentid_filter = ContentIdFilter()
+
+    first: set[int] = set()
+    assert list(contentid_filter.unseen(rows, first)) == rows
+    # Not committed yet: another shard still loads them
+    assert list(contentid_filter.unseen(rows, set())) == rows
+
+    contentid_filter.mark_loaded(first)
+    assert list(contentid_filter.unseen(rows, set())) == []
@@ -0,0 +1,112 @@
+from datetime import datetime
+from typing import Any
+
+from database_setup.pipeline import (
+    insert_places,
+    page_place_rows,
+    parallel_place_rows,
+)
+from database_setup.tourapi import AreaBasedListAPI
+from database_setup.tourapi.types import Body, Header, Items, Response, ResponseRoot
+
+
+class FakeSession:
+    def __init__(self) -> None:
+        self.pending: list[Any] = []
+        self.batches: list[list[Any]] = []
+        self.expunged = 0
+        self.commits = 0
+
+    def add_all(self, places: Any) -> None:
+        self.pending.extend(places)
+
+    def flush(self) -> None:
+        self.batches.append(self.pending)
+        self.pending = []
+
+    def commit(self) -> None:
+        self.commits += 1
+
+    def expunge_all(self) -> None:
+        self.expunged += 1
+
+
+def item(
+    contentid: int, firstimage2: str, modifiedtime: int = 20240101000000
+) -> AreaBasedListAPI.Item:
+    return AreaBasedListAPI.Item(
+        areacode=1,
+        sigungucode=13,
+        title=f"place {contentid}",
+        firstimage="",
+        firstimage2=firstimage2,
+        mapx=126.9,
+        mapy=37.5,
+        contentid=contentid,
+        contenttypeid=12,
+        addr1="",
+        addr2="",
+        cat1="A01",
+        cat2="A0101",
+        cat3="A01010100",
+        createdtime=20240101000000,
+        modifiedtime=modifiedtime,
+        cpyrhtDivCd="Type3",
+        mlevel=None,
+        booktour=None,
+        tel="",
+        zipcode=None,
+    )
+
+
+def test_insert_places_in_batches():
+    def items():
+        for contentid in range(25):
+            yield item(contentid, "" if contentid % 5 == 0 else "http://image")
+
+    session = FakeSession()
+    inserted = insert_places(session, items(), batch_size=8)  # type: ignore
+
+    assert inserted == 20
+    assert [len(batch) for batch in session.batches] == [8, 8, 4]
+    assert session.expunged == 3
+    assert session.commits == 0  # The caller commits the whole load at once
+    first_batch = [place.contentid for place in session.batches[0]]
+    assert first_batch == [1, 2, 3, 4, 6, 7, 8, 9]
+    assert session.batches[0][0].coordinate == "POINT(126.9 37.5)"
+    assert session.batches[0][0].modifiedtime == datetime(2024, 1, 1)
+
+
+def page(page_no: int, size: int = 10) -> bytes:
+    """Content of a TourAPI page; a place without image every 5 places"""
+    contentids = range((page_no - 1) * size, page_no * size)
+    items = [item(i, "" if i % 5 == 0 else "http://image") for i in contentids]
+    Root = ResponseRoot[AreaBasedListAPI.Item]
+    return Root(
+        response=Response[AreaBasedListAPI.Item](
+            header=Header(resultCode="0000", resultMsg="OK"),
+            body=Body[AreaBasedListAPI.Item](
+                items=Items[AreaBasedListAPI.Item](item=items),
+                numOfRows=size,
+                pageNo=page_no,
+                totalCount=100,
+            ),
+        )
+    ).model_dump_json().encode()
+
+
+def test_page_place_rows():
+    rows = page_place_rows(page(1))
+    assert [row.contentid for row in rows] == [1, 2, 3, 4, 6, 7, 8, 9]
+    assert rows[0].modifiedtime == datetime(2024, 1, 1)
+
+
+def test_parallel_place_rows():
+    pages = [page(page_no) for page_no in range(1, 11)]
+    expected = [row for content in pages for row in page_place_rows(content)]
+
+    assert list(parallel_place_rows(pages, workers=1)) == expected
+    # Generators are consumed lazily, like BaseAPI.iter_raw_pages
+    assert list(parallel_place_rows(iter(pages), workers=2)) == expected
+    unordered = parallel_place_rows(iter(pages), workers=2, ordered=False)
+    assert sorted(unordered) == expected
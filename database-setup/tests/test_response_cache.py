@@ -0,0 +1,74 @@
+import gzip
+import os
+import time
+
+import pytest
+
+from database_setup.tourapi.errors import TourAPIError
+from database_setup.tourapi.response_cache import CacheMissError, ResponseCache
+
+from .test_base_api import OK_JSON, FakeResponse, Params, api_with, xml_error
+
+URL = "http://localhost/fake"
+
+
+def test_key_ignores_service_key_and_order():
+    key = ResponseCache.key(URL, dict(pageNo=1, numOfRows=10, serviceKey="a"))
+    assert key == ResponseCache.key(URL, dict(numOfRows=10, pageNo=1, serviceKey="b"))
+    assert key != ResponseCache.key(URL, dict(numOfRows=10, pageNo=2))
+
+
+def test_store_and_load(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    params = dict(pageNo=1, serviceKey="secret")
+    assert cache.load(URL, params) is None
+
+    cache.store(URL, params, OK_JSON.encode())
+    assert cache.load(URL, params) == OK_JSON.encode()
+
+    path = cache.path(cache.key(URL, params))
+    with open(path, "rb") as file:
+        assert gzip.decompress(file.read()) == OK_JSON.encode()
+    assert os.listdir(os.path.dirname(path)) == [os.path.basename(path)]
+
+
+def test_expired_entry(tmp_path):
+    cache = ResponseCache(str(tmp_path), ttl_second=60)
+    cache.store(URL, dict(pageNo=1), OK_JSON.encode())
+    path = cache.path(cache.key(URL, dict(pageNo=1)))
+    an_hour_ago = time.time() - 60 * 60
+    os.utime(path, (an_hour_ago, an_hour_ago))
+
+    assert cache.load(URL, dict(pageNo=1)) is None
+    # Stale entries are better than nothing when offline
+    replay = ResponseCache(str(tmp_path), ttl_second=60, replay_only=True)
+    assert replay.load(URL, dict(pageNo=1)) == OK_JSON.encode()
+
+
+def test_replay_only_miss(tmp_path):
+    cache = ResponseCache(str(tmp_path), replay_only=True)
+    with pytest.raises(CacheMissError):
+        cache.load(URL, dict(pageNo=1))
+
+
+def test_get_uses_cache(tmp_path):
+    params = Params(numOfRows=10, pageNo=1, areaCode=1)
+    api = api_with([FakeResponse(200, OK_JSON)])
+    api.cache = ResponseCache(str(tmp_path))
+    api.get_body(params)
+
+    # Served from disk: no response left in the session
+    replay = api_with([])
+    replay.cache = ResponseCache(str(tmp_path), replay_only=True)
+    body = replay.get_body(params)
+    assert [item.contentid for item in body.items.item] == [1]
+    with pytest.raises(CacheMissError):
+        replay.get_body(params.model_copy(update={"pageNo": 2}))
+
+
+def test_get_does_not_cache_errors(tmp_path):
+    api = api_with([FakeResponse(200, xml_error(22, "LIMITED_NUMBER_OF_SERVICE"))])
+    api.cache = ResponseCache(str(tmp_path))
+    with pytest.raises(TourAPIError):
+        api.get_body(Params(numOfRows=10, pageNo=1, areaCode=1))
+    assert os.listdir(tmp_path) == []
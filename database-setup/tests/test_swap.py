@@ -0,0 +1,96 @@
+from typing import Any
+
+import pytest
+from pytest import MonkeyPatch
+
+from database_setup import swap
+from database_setup.swap import (
+    IndexDefinition,
+    grant_statement,
+    staging_index_statement,
+    suffixed_name,
+)
+
+
+def test_staging_index_statement():
+    gist = IndexDefinition(
+        "idx_place_coordinate",
+        "CREATE INDEX idx_place_coordinate ON public.place USING gist (coordinate)",
+    )
+    assert staging_index_statement(gist) == (
+        "CREATE INDEX idx_place_coordinate_staging ON public.place_staging "
+        "USING gist (coordinate)"
+    )
+
+    unique = IndexDefinition(
+        "ix_place_title",
+        "CREATE UNIQUE INDEX ix_place_title ON public.place USING btree (title)",
+    )
+    assert staging_index_statement(unique).startswith(
+        "CREATE UNIQUE INDEX ix_place_title_staging ON public.place_staging"
+    )
+
+
+def test_staging_index_statement_rejects_unknown_definition():
+    with pytest.raises(ValueError):
+        staging_index_statement(IndexDefinition("weird", "CREATE SOMETHING"))
+
+
+def test_suffixed_name_fits_identifier():
+    assert suffixed_name("ix_place_title", "_staging") == "ix_place_title_staging"
+
+    long_name = "ix_place_coordinate_" + "x" * 40
+    staging = suffixed_name(long_name, "_staging")
+    assert len(staging) == len(suffixed_name(long_name, "_old")) == 63
+    assert staging.endswith("_staging")
+    assert staging != suffixed_name(long_name + "y", "_staging")
+
+
+def test_grant_statement():
+    assert grant_statement("SELECT", "place_staging", "PUBLIC") == (
+        "GRANT SELECT ON place_staging TO PUBLIC"
+    )
+    assert grant_statement("SELECT", "place_staging", 'read"er') == (
+        'GRANT SELECT ON place_staging TO "read""er"'
+    )
+
+
+class FakeLockSession:
+    def __init__(self, acquired: bool):
+        self.acquired = acquired
+        self.statements: list[str] = []
+        self.execution_options: dict[str, Any] = {}
+
+    def __enter__(self) -> "FakeLockSession":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        pass
+
+    def connection(self, execution_options: dict[str, Any]) -> None:
+        self.execution_options = execution_options
+
+    def execute(self, statement: Any, params: dict[str, Any]) -> Any:
+        self.statements.append(str(statement))
+        acquired = self.acquired
+
+        class Result:
+            def scalar(self) -> bool:
+                return acquired
+
+        return Result()
+
+
+def test_place_load_lock(monkeypatch: MonkeyPatch):
+    session = FakeLockSession(acquired=True)
+    monkeypatch.setattr(swap.db, "get_session_with", lambda: session)
+    with swap.place_load_lock():
+        assert session.statements == ["SELECT pg_try_advisory_lock(:key)"]
+    assert session.statements[-1] == "SELECT pg_advisory_unlock(:key)"
+    assert session.execution_options == {"isolation_level": "AUTOCOMMIT"}
+
+    session = FakeLockSession(acquired=False)
+    with pytest.raises(RuntimeError):
+        with swap.place_load_lock():
+            pass
+    assert len(session.statements) == 1
@@ -0,0 +1,56 @@
+from datetime import datetime
+
+from sqlalchemy.dialects import postgresql
+
+from database_setup.sync import (
+    Listing,
+    changed_places,
+    unassigned_places,
+    unfilled_places_exist,
+)
+
+from .test_pipeline import item
+
+
+def test_changed_places_stops_at_high_water_mark():
+    places = [
+        item(1, "http://image", modifiedtime=20240920120000),
+        item(2, "", modifiedtime=20240915090000),
+        item(3, "http://image", modifiedtime=20240910000000),  # == mark
+        item(4, "http://image", modifiedtime=20240901000000),
+        item(5, "http://image", modifiedtime=20240801000000),
+    ]
+    consumed: list[int] = []
+
+    def listed():
+        for place in places:
+            consumed.append(place.contentid)
+            yield place
+
+    listing = Listing()
+    changed = changed_places(listed(), datetime(2024, 9, 10), listing)
+
+    assert [place.contentid for place in changed] == [1, 2, 3]
+    assert consumed == [1, 2, 3, 4]  # Nothing older is fetched
+    assert listing.contentids == {1, 3}
+    assert listing.newest == datetime(2024, 9, 20, 12)
+
+
+def test_changed_places_without_mark_lists_everything():
+    places = [item(i, "http://image") for i in range(3)]
+    assert len(list(changed_places(places, None, Listing()))) == 3
+
+
+def test_unfilled_places_exist_filters_the_area():
+    def compiled(sigungucode):
+        statement = unfilled_places_exist(1, sigungucode)
+        return str(statement.compile(dialect=postgresql.dialect()))
+
+    assert "place.contenttypeid = " in compiled(None)
+    assert "place.sigungucode" not in compiled(None)
+    assert "place.sigungucode = " in compiled(5)
+
+
+def test_unassigned_places():
+    sql = str(unassigned_places().compile(dialect=postgresql.dialect()))
+    assert sql.startswith("DELETE FROM place WHERE place.areacode = ")